@@ -1,25 +1,33 @@
-from flask import Blueprint, render_template, jsonify, Response, stream_with_context
-import requests
-from config import BACKEND_URL
+from flask import Blueprint, render_template, jsonify, Response, request
+from config import BACKEND_URL, UPSTREAM_TIMEOUT
+from .upstream import get_session, get_resource, get_stream
 main = Blueprint('main', __name__)
 @main.route('/')
 def index():
     return render_template('index.html', backend_url=BACKEND_URL)
 @main.route('/alerts')
 def alerts():
+    data, age, error = get_resource('/get_alerts', 'alerts').get()
+    if data is None:
+        return jsonify({'alerts': [], 'total': 0, 'stale': True, 'error': error})
+    # stale: the backend did not answer in time, these are the last good alerts
+    response = {**data, 'stale': error is not None, 'age': round(age, 2)}
+    if error is not None:
+        response['error'] = error
+    return jsonify(response)
+@main.route('/alerts/history')
+def alerts_history():
+    # Episodes are logged by the backend; pass the query through unchanged
     try:
-        r = requests.get(f"{BACKEND_URL}/get_alerts", timeout=3)
-        return jsonify(r.json())
+        r = get_session().get(f"{BACKEND_URL}/alerts/history", params=request.args, timeout=UPSTREAM_TIMEOUT)
+        return jsonify(r.json()), r.status_code
     except Exception as e:
-        return jsonify({'alerts': [], 'total': 0, 'error': str(e)})
+        return jsonify({'alerts': [], 'next': None, 'error': str(e)}), 502
 @main.route('/video')
-def video():
-    def generate():
-        with requests.get(f"{BACKEND_URL}/video_feed", stream=True) as r:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:
-                    yield chunk
-    return Response(stream_with_context(generate()), mimetype='multipart/x-mixed-replace; boundary=frame')
+@main.route('/video/<camera_id>')
+def video(camera_id=None):
+    # All viewers of a camera share one backend stream
+    return Response(get_stream(camera_id).frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 from flask import Blueprint, jsonify, request
 
 mobile_app = Blueprint('mobile_app', __name__)
@@ -0,0 +1,255 @@
+"""Shared connections to the monitoring backend.
+
+Every phone used to open its own /video_feed stream, which cost the backend
+one more MJPEG connection per viewer. Here each camera gets a single upstream
+stream, read by one background thread, and whole frames are fanned out to
+every local viewer. JSON calls go through one pooled session, and polled
+JSON resources are cached briefly so phones share one backend request.
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config import (BACKEND_URL, UPSTREAM_POOL_SIZE, UPSTREAM_TIMEOUT, UPSTREAM_IDLE_TIMEOUT,
+                    ALERTS_CACHE_TTL, ALERTS_MAX_WAIT)
+
+CHUNK_SIZE = 64 * 1024
+MAX_PART_SIZE = 8 * 1024 * 1024  # give up on a stream that never closes a part
+MAX_BACKOFF = 10
+
+_session = None
+_session_lock = threading.Lock()
+_streams = {}
+_streams_lock = threading.Lock()
+_resources = {}
+_resources_lock = threading.Lock()
+
+
+def get_session():
+    """Get the pooled session used for every backend request"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=UPSTREAM_POOL_SIZE, pool_maxsize=UPSTREAM_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def get_boundary(content_type, default='frame'):
+    """Boundary of a multipart Content-Type header"""
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary' and value:
+            return value.strip('"')
+    return default
+
+
+class MultipartParser:
+    """Incremental parser splitting a multipart byte stream into whole parts"""
+
+    def __init__(self, boundary):
+        self.delimiter = b'--' + boundary.encode()
+        self.terminator = b'\r\n' + self.delimiter
+        self.buffer = bytearray()
+        self.scan_from = 0  # where to resume looking for the end of a part
+
+    def feed(self, data):
+        """Add bytes and return (headers, body) for each completed part; headers are (name, value) pairs"""
+        self.buffer += data
+        parts = []
+        while True:
+            start = self.buffer.find(self.delimiter)
+            if start < 0:
+                # Keep only what could be the start of a delimiter
+                del self.buffer[:max(0, len(self.buffer) - len(self.delimiter))]
+                break
+            if start:
+                del self.buffer[:start]
+                self.scan_from = 0
+            header_end = self.buffer.find(b'\r\n\r\n', len(self.delimiter))
+            if header_end < 0:
+                break
+            headers = []
+            for line in bytes(self.buffer[len(self.delimiter):header_end]).decode('latin-1').split('\r\n'):
+                key, _, value = line.partition(':')
+                if value:
+                    headers.append((key.strip(), value.strip()))
+            length = next((value for key, value in headers if key.lower() == 'content-length'), None)
+            body_start = header_end + 4
+
+            if length is not None:
+                body_end = body_start + int(length)
+                if len(self.buffer) < body_end:
+                    break
+            else:
+                body_end = self.buffer.find(self.terminator, max(body_start, self.scan_from))
+                if body_end < 0:
+                    if len(self.buffer) > MAX_PART_SIZE:
+                        raise ValueError('Multipart part exceeds the size limit')
+                    self.scan_from = max(body_start, len(self.buffer) - len(self.terminator))
+                    break
+
+            parts.append((headers, bytes(self.buffer[body_start:body_end])))
+            del self.buffer[:body_end]
+            self.scan_from = 0
+        return parts
+
+
+class UpstreamStream:
+    """One backend MJPEG stream shared by every local viewer of a camera"""
+
+    def __init__(self, path):
+        self.url = f"{BACKEND_URL}{path}"
+        self.condition = threading.Condition()
+        self.part = None
+        self.sequence = 0
+        self.viewers = 0
+        self.idle_since = None
+        self.thread = None
+
+    def frames(self):
+        """Yield the latest whole multipart part; slow viewers skip frames instead of queueing"""
+        with self.condition:
+            self.viewers += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        try:
+            seen = 0
+            while True:
+                with self.condition:
+                    self.condition.wait_for(lambda: self.sequence != seen and self.part is not None)
+                    part, seen = self.part, self.sequence
+                yield part
+        finally:
+            with self.condition:
+                self.viewers -= 1
+
+    def _publish(self, headers, body):
+        # Pass part headers such as X-Frame-Seq through; Content-Length is always set
+        lines = [f"{key}: {value}\r\n" for key, value in headers if key.lower() != 'content-length']
+        if not any(key.lower() == 'content-type' for key, _ in headers):
+            lines.insert(0, 'Content-Type: image/jpeg\r\n')
+        part = b''.join((
+            f"--frame\r\n{''.join(lines)}Content-Length: {len(body)}\r\n\r\n".encode(),
+            body,
+            b'\r\n'
+        ))
+        with self.condition:
+            self.part = part
+            self.sequence += 1
+            self.condition.notify_all()
+
+    def _should_stop(self):
+        """Stop once nobody has watched for a while; decided under the lock so a new viewer restarts the thread"""
+        with self.condition:
+            if self.viewers:
+                self.idle_since = None
+                return False
+            now = time.monotonic()
+            if self.idle_since is None:
+                self.idle_since = now
+            if now - self.idle_since < UPSTREAM_IDLE_TIMEOUT:
+                return False
+            self.thread = None
+            self.part = None
+            self.idle_since = None
+            return True
+
+    def _run(self):
+        backoff = 1
+        while not self._should_stop():
+            try:
+                with get_session().get(self.url, stream=True, timeout=UPSTREAM_TIMEOUT) as r:
+                    r.raise_for_status()
+                    parser = MultipartParser(get_boundary(r.headers.get('Content-Type', '')))
+                    for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                        for headers, body in parser.feed(chunk):
+                            self._publish(headers, body)
+                            backoff = 1
+                        if self._should_stop():
+                            return
+            except Exception as e:
+                print(f"Upstream stream {self.url} failed: {e}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+def get_stream(camera_id=None):
+    """Get the shared upstream stream of a camera"""
+    path = f"/video_feed/{camera_id}" if camera_id else '/video_feed'
+    with _streams_lock:
+        if path not in _streams:
+            _streams[path] = UpstreamStream(path)
+        return _streams[path]
+
+
+class CachedResource:
+    """Backend JSON resource behind a short-TTL cache with at most one fetch in flight"""
+
+    def __init__(self, path, key, ttl=ALERTS_CACHE_TTL, max_wait=ALERTS_MAX_WAIT):
+        self.url = f"{BACKEND_URL}{path}"
+        self.key = key  # a good response is a JSON object with this key
+        self.ttl = ttl
+        self.max_wait = max_wait
+        self.condition = threading.Condition()
+        self.value = None
+        self.fetched_at = None
+        self.error = None
+        self.fetch_started = None  # set while a fetch is in flight
+        self.generation = 0  # bumped when a fetch finishes
+
+    def get(self):
+        """
+        Return (value, age in seconds, error); value is None until a fetch has succeeded.
+
+        Requests arriving together share one upstream fetch. Nobody waits more
+        than max_wait after that fetch started: if the backend is slow, callers
+        get the last good value and its age instead.
+        """
+        with self.condition:
+            now = time.monotonic()
+            if self.value is not None and now - self.fetched_at < self.ttl:
+                return self.value, now - self.fetched_at, None
+            if self.fetch_started is None:
+                self.fetch_started = now
+                threading.Thread(target=self._fetch, daemon=True).start()
+            generation = self.generation
+            self.condition.wait_for(lambda: self.generation != generation,
+                                    timeout=max(0, self.fetch_started + self.max_wait - now))
+            if self.generation == generation and self.error is None:
+                error = 'Backend is slow to respond'
+            else:
+                error = self.error
+            age = time.monotonic() - self.fetched_at if self.value is not None else None
+            return self.value, age, error
+
+    def _fetch(self):
+        try:
+            r = get_session().get(self.url, timeout=UPSTREAM_TIMEOUT)
+            r.raise_for_status()
+            value, error = r.json(), None
+            # An error body must not replace the last good value
+            if not isinstance(value, dict) or self.key not in value:
+                raise ValueError(f"Backend response has no '{self.key}'")
+        except Exception as e:
+            value, error = None, str(e)
+        with self.condition:
+            if error is None:
+                self.value = value
+                self.fetched_at = time.monotonic()
+            self.error = error
+            self.fetch_started = None
+            self.generation += 1
+            self.condition.notify_all()
+
+
+def get_resource(path, key):
+    """Get the shared cache of a backend JSON resource whose responses carry key"""
+    with _resources_lock:
+        if path not in _resources:
+            _resources[path] = CachedResource(path, key)
+        return _resources[path]
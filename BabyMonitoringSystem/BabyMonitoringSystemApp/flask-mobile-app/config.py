@@ -1,4 +1,9 @@
 BACKEND_URL = "http://192.168.1.143:5001"  # <-- Change to your backend's IP and port
+UPSTREAM_POOL_SIZE = 10  # Pooled keep-alive connections to the backend
+UPSTREAM_TIMEOUT = (3, 10)  # (connect, read) seconds for backend requests
+UPSTREAM_IDLE_TIMEOUT = 5  # Seconds a camera stream stays open after its last viewer leaves
+ALERTS_CACHE_TTL = 0.5  # Seconds phones share one /get_alerts response
+ALERTS_MAX_WAIT = 0.25  # Seconds to wait on a slow backend before serving the last good alerts
 class Config:
     DEBUG = True
     TESTING = False
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# config and the app package are imported by name, as when run.py starts the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
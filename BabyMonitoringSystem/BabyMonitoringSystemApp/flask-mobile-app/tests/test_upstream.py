@@ -0,0 +1,112 @@
+import time
+import pytest
+from app import upstream
+from app.upstream import MultipartParser, CachedResource
+
+
+def make_part(body, headers=b''):
+    return (b'--frame\r\nContent-Type: image/jpeg\r\n' + headers + b'\r\n' + body + b'\r\n')
+
+
+def feed_in_chunks(parser, data, size):
+    parts = []
+    for i in range(0, len(data), size):
+        parts += parser.feed(data[i:i + size])
+    return parts
+
+
+@pytest.mark.parametrize('size', [1, 7, 64])
+def test_part_split_across_chunks_with_content_length(size):
+    body = b'\xff\xd8' + bytes(range(256)) * 4 + b'\xff\xd9'
+    data = make_part(body, b'Content-Length: %d\r\nX-Frame-Seq: 7\r\n' % len(body))
+    parts = feed_in_chunks(MultipartParser('frame'), data, size)
+    # Complete without waiting for the next boundary
+    assert len(parts) == 1
+    headers, parsed = parts[0]
+    assert parsed == body
+    assert ('X-Frame-Seq', '7') in headers
+
+
+@pytest.mark.parametrize('size', [1, 5, 100])
+def test_parts_without_content_length_end_at_next_boundary(size):
+    bodies = [b'first frame', b'second \r\n--fram frame']
+    data = b''.join(make_part(body) for body in bodies) + b'--frame\r\n'
+    parts = feed_in_chunks(MultipartParser('frame'), data, size)
+    assert [body for _, body in parts] == bodies
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} error")
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, responses, delay=0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(responses, delay=0):
+        fake = FakeSession(responses, delay)
+        monkeypatch.setattr(upstream, 'get_session', lambda: fake)
+        return fake
+    return install
+
+
+def test_value_is_cached_until_ttl_expires(session):
+    fake = session([FakeResponse(200, {'alerts': [1]}), FakeResponse(200, {'alerts': [2]})])
+    resource = CachedResource('/get_alerts', 'alerts', ttl=0.2, max_wait=1)
+    assert resource.get()[0] == {'alerts': [1]}
+    assert resource.get()[0] == {'alerts': [1]}
+    assert fake.calls == 1
+    time.sleep(0.25)
+    value, age, error = resource.get()
+    assert value == {'alerts': [2]} and error is None and age < 0.2
+    assert fake.calls == 2
+
+
+@pytest.mark.parametrize('response', [
+    FakeResponse(500, {'alerts': []}),
+    FakeResponse(200, {'error': 'camera offline'}),
+    FakeResponse(200, ['not', 'an', 'object']),
+])
+def test_bad_response_keeps_last_good_value(session, response):
+    session([FakeResponse(200, {'alerts': [1]}), response])
+    resource = CachedResource('/get_alerts', 'alerts', ttl=0, max_wait=1)
+    assert resource.get() == ({'alerts': [1]}, pytest.approx(0, abs=0.1), None)
+    value, _, error = resource.get()
+    assert value == {'alerts': [1]}
+    assert error is not None
+
+
+def test_no_value_before_first_good_response(session):
+    session([FakeResponse(200, {'error': 'starting'})])
+    value, age, error = CachedResource('/get_alerts', 'alerts', max_wait=1).get()
+    assert value is None and age is None
+    assert "no 'alerts'" in error
+
+
+def test_slow_backend_serves_last_value(session):
+    session([FakeResponse(200, {'alerts': [1]}), FakeResponse(200, {'alerts': [2]})], delay=0.2)
+    resource = CachedResource('/get_alerts', 'alerts', ttl=0, max_wait=0.05)
+    assert resource.get()[2] == 'Backend is slow to respond'
+    time.sleep(0.3)
+    value, _, error = resource.get()
+    assert value == {'alerts': [1]}
+    assert error == 'Backend is slow to respond'
@@ -0,0 +1,229 @@
+"""
+Persistent alert episode log in SQLite
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from config import (
+    ALERT_LOG_PATH,
+    ALERT_LOG_QUEUE_SIZE,
+    ALERT_LOG_BATCH_SIZE,
+    ALERT_LOG_FLUSH_INTERVAL,
+    ALERT_LOG_PAGE_LIMIT,
+    ALERT_LOG_MAX_PAGE_LIMIT
+)
+
+COLUMNS = ('id', 'camera_id', 'episode_id', 'type', 'hazard', 'track_id', 'start_time',
+           'end_time', 'last_seen', 'min_distance', 'frame_count', 'message')
+
+# Episode IDs restart with the process, so an episode is identified by its
+# camera, start time and ID together. rowid-backed indexes make (start_time,
+# id) keyset pagination an index range scan for every filter combination.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_episodes (
+    id INTEGER PRIMARY KEY,
+    camera_id TEXT NOT NULL,
+    episode_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    hazard TEXT NOT NULL,
+    track_id INTEGER,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    last_seen REAL NOT NULL,
+    min_distance REAL NOT NULL,
+    frame_count INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    UNIQUE (camera_id, start_time, episode_id)
+);
+CREATE INDEX IF NOT EXISTS alert_episodes_start_time ON alert_episodes (start_time);
+CREATE INDEX IF NOT EXISTS alert_episodes_hazard ON alert_episodes (hazard, start_time);
+"""
+
+UPSERT = """
+INSERT INTO alert_episodes (camera_id, episode_id, type, hazard, track_id, start_time,
+                            end_time, last_seen, min_distance, frame_count, message)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (camera_id, start_time, episode_id) DO UPDATE SET
+    end_time = excluded.end_time,
+    last_seen = excluded.last_seen,
+    min_distance = excluded.min_distance,
+    frame_count = excluded.frame_count,
+    message = excluded.message
+"""
+
+
+def encode_cursor(row):
+    """Cursor pointing just past a row in newest-first order"""
+    return f"{row['start_time']!r}:{row['id']}"
+
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor from encode_cursor
+
+    Returns:
+        tuple: (start_time, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    start_time, _, row_id = cursor.partition(':')
+    return float(start_time), int(row_id)
+
+
+class AlertLog:
+    """
+    Alert episodes stored in SQLite by a background writer
+
+    record() only copies the episode onto a bounded queue, so the frame loop
+    never waits on disk; the writer thread commits queued episodes in
+    batches. Episodes are written when they open and again when they close,
+    so an episode still in progress survives a crash.
+    """
+
+    def __init__(self, path=ALERT_LOG_PATH):
+        """
+        Open the database, creating the schema if needed
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=ALERT_LOG_QUEUE_SIZE)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._run, name='alert-log-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        """Open a connection; WAL lets readers run while the writer commits"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, camera_id, episode, closed=False):
+        """
+        Queue the current state of an episode for writing
+
+        Args:
+            camera_id: Camera the episode was seen on
+            episode: Episode dict from DetectionProcessor
+            closed: Whether the episode has ended
+        """
+        row = (
+            camera_id, episode['id'], episode['type'], episode['hazard'],
+            episode.get('track_id'), episode['start_time'],
+            episode['last_seen'] if closed else None, episode['last_seen'],
+            float(episode['min_distance']), episode['frame_count'], episode['message']
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Writer loop: commit queued rows in batches"""
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                return
+            deadline = time.monotonic() + ALERT_LOG_FLUSH_INTERVAL
+            stop = False
+            while len(batch) < ALERT_LOG_BATCH_SIZE:
+                try:
+                    row = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            try:
+                with conn:
+                    conn.executemany(UPSERT, batch)
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                self.dropped += len(batch)
+                print(f"Error writing alert log: {e}")
+            if stop:
+                return
+
+    def close(self):
+        """Flush queued episodes and stop the writer"""
+        self._queue.put(None)
+        self._writer.join()
+
+    def query(self, start=None, end=None, hazard=None, camera_id=None,
+              limit=ALERT_LOG_PAGE_LIMIT, cursor=None):
+        """
+        Get one page of logged episodes, newest first
+
+        Args:
+            start: Only episodes starting at or after this Unix time
+            end: Only episodes starting before this Unix time
+            hazard: Only episodes for this hazard class
+            camera_id: Only episodes from this camera
+            limit: Page size, capped at ALERT_LOG_MAX_PAGE_LIMIT
+            cursor: 'next' value of the previous page
+
+        Returns:
+            dict: {'alerts': [...], 'next': cursor of the next page or None}
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(int(limit), ALERT_LOG_MAX_PAGE_LIMIT))
+        conditions, params = [], []
+        if start is not None:
+            conditions.append('start_time >= ?')
+            params.append(start)
+        if end is not None:
+            conditions.append('start_time < ?')
+            params.append(end)
+        if hazard:
+            conditions.append('hazard = ?')
+            params.append(hazard)
+        if camera_id:
+            conditions.append('camera_id = ?')
+            params.append(camera_id)
+        if cursor:
+            conditions.append('(start_time, id) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM alert_episodes"
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY start_time DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        with closing(self._connect()) as conn:
+            rows = [dict(row) for row in conn.execute(sql, params)]
+
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        alerts = rows[:limit]
+        for alert in alerts:
+            alert['timestamp'] = alert['start_time']
+        return {'alerts': alerts, 'next': next_cursor}
+
+
+# Global alert log instance
+alert_log = None
+_alert_log_lock = threading.Lock()
+
+
+def get_alert_log():
+    """Get or create the global alert log"""
+    global alert_log
+    with _alert_log_lock:
+        if alert_log is None:
+            alert_log = AlertLog()
+            atexit.register(alert_log.close)
+        return alert_log
@@ -0,0 +1,175 @@
+"""
+Bounded, time-ordered alert history and live alert events
+"""
+import json
+import time
+import threading
+from collections import deque
+from notifier import AsyncNotifier
+
+
+class AlertHistory:
+    """
+    Ring buffer of alerts ordered by timestamp
+
+    Holds at most `capacity` alerts and drops alerts older than `max_age`
+    seconds, so memory stays flat no matter how long the system runs.
+    Time-window queries use binary search over the timestamps.
+    """
+
+    def __init__(self, capacity, max_age):
+        """
+        Initialize an empty history
+
+        Args:
+            capacity: Maximum number of alerts kept
+            max_age: Seconds an alert is kept after its timestamp
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self._items = [None] * capacity
+        self._times = [0.0] * capacity
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def _slot(self, index):
+        """Map a logical index (0 = oldest) to a buffer slot"""
+        return (self._start + index) % self.capacity
+
+    def _evict_before(self, cutoff):
+        """Drop alerts with a timestamp older than cutoff"""
+        while self._size and self._times[self._start] < cutoff:
+            self._items[self._start] = None
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+
+    def _first_index_after(self, cutoff):
+        """Binary search for the first logical index with timestamp > cutoff"""
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if self._times[self._slot(mid)] > cutoff:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def append(self, alert):
+        """
+        Add an alert, overwriting the oldest one when full
+
+        Args:
+            alert: Alert dict with a 'timestamp' key, not older than the last one
+        """
+        timestamp = alert['timestamp']
+        with self._lock:
+            self._evict_before(timestamp - self.max_age)
+            if self._size == self.capacity:
+                self._start = (self._start + 1) % self.capacity
+                self._size -= 1
+            slot = self._slot(self._size)
+            self._items[slot] = alert
+            self._times[slot] = timestamp
+            self._size += 1
+
+    def get_recent(self, seconds, limit, now=None):
+        """
+        Get the newest alerts from the last N seconds
+
+        Args:
+            seconds: Size of the time window
+            limit: Maximum number of alerts to return
+            now: Reference time, defaults to the current time
+
+        Returns:
+            tuple: (alerts oldest first, number of alerts in the window)
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            first = self._first_index_after(now - seconds)
+            count = self._size - first
+            start = max(first, self._size - limit)
+            alerts = [self._items[self._slot(i)] for i in range(start, self._size)]
+        return alerts, count
+
+
+class AlertEventBus:
+    """
+    Sequence-numbered alert events for Server-Sent Events clients
+
+    Events are formatted once when published and kept in a bounded backlog,
+    so a reconnecting client can resume from its Last-Event-ID.
+    """
+
+    def __init__(self, backlog):
+        """
+        Initialize the bus
+
+        Args:
+            backlog: Number of recent events kept for resuming clients
+        """
+        self._events = deque(maxlen=backlog)
+        self._next_id = 1
+        self._condition = threading.Condition()
+        self._async = AsyncNotifier()
+
+    def publish(self, event_type, data):
+        """
+        Publish an event to every connected client
+
+        Args:
+            event_type: SSE event name
+            data: JSON-serializable payload
+        """
+        with self._condition:
+            event_id = self._next_id
+            self._next_id += 1
+            message = f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+            self._events.append((event_id, message))
+            self._condition.notify_all()
+        self._async.notify_all()
+
+    @property
+    def last_event_id(self):
+        """ID of the most recently published event, 0 if none"""
+        return self._next_id - 1
+
+    def can_resume(self, last_event_id):
+        """Whether every event after last_event_id is still in the backlog"""
+        with self._condition:
+            if last_event_id > self.last_event_id:
+                # Client saw events from before a restart
+                return False
+            if last_event_id == self.last_event_id:
+                return True
+            return bool(self._events) and self._events[0][0] <= last_event_id + 1
+
+    def wait_for_events(self, last_event_id, timeout):
+        """
+        Wait for events newer than last_event_id
+
+        Args:
+            last_event_id: ID of the last event the client has seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            list: (event_id, message) pairs, empty on timeout
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.last_event_id > last_event_id, timeout
+            )
+            return [event for event in self._events if event[0] > last_event_id]
+
+    async def wait_for_events_async(self, last_event_id, timeout):
+        """Coroutine version of wait_for_events for asyncio servers"""
+        await self._async.wait_for(
+            lambda: self.last_event_id > last_event_id, timeout
+        )
+        with self._condition:
+            return [event for event in self._events if event[0] > last_event_id]
@@ -2,6 +2,7 @@
 Flask application factory and setup
 """
 from flask import Flask
+from models import start_model_loading
 from routes import register_routes
 
 
@@ -9,6 +10,10 @@ def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
     
+    # Load and warm up the model in the background so the server starts
+    # answering right away; streaming routes report "warming up" until then
+    start_model_loading()
+    
     # Register routes
     register_routes(app)
     
@@ -0,0 +1,271 @@
+"""
+Asyncio (ASGI) serving mode for the streaming endpoints
+
+/video_feed, /get_alerts, /alerts/stream and /frames/stream are served as
+coroutines over the shared frame broadcaster and event buses, so idle viewers cost a
+suspended task instead of an OS thread. Every other route is handed to the
+Flask app.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+from camera import get_camera_handler
+from encoding import parse_stream_options
+from models import get_model_status
+from routes import start_alert_stream, start_frame_stream
+from config import ALERT_STREAM_HEARTBEAT, MODEL_RETRY_AFTER
+
+
+async def _get_camera(camera_id):
+    """Get a camera handler without blocking the event loop, None if unknown"""
+    try:
+        return await asyncio.to_thread(get_camera_handler, camera_id)
+    except KeyError:
+        return None
+
+
+def _get_header(scope, name):
+    """Get a request header value as a string"""
+    name = name.lower().encode()
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _parse_last_event_id(scope):
+    """Read the resume position from the Last-Event-ID header or query string"""
+    query = parse_qs(scope.get('query_string', b'').decode())
+    value = _get_header(scope, 'Last-Event-ID') or query.get('last_event_id', [None])[0]
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _send_json(send, data, status=200, extra_headers=()):
+    """Send a complete JSON response"""
+    body = json.dumps(data).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *extra_headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_if_warming_up(send):
+    """
+    Answer with 503 while the model is still loading
+
+    Returns:
+        bool: True if a warming up response was sent
+    """
+    status = get_model_status()
+    if status['ready']:
+        return False
+    await _send_json(
+        send,
+        {**status, 'message': 'Model is warming up'},
+        503,
+        extra_headers=[(b'retry-after', str(MODEL_RETRY_AFTER).encode())]
+    )
+    return True
+
+
+async def _wait_for_disconnect(receive):
+    """Return once the client has gone away"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def _stream(receive, send, content_type, chunks, extra_headers=()):
+    """
+    Send an endless response body until the client disconnects
+
+    Args:
+        receive: ASGI receive callable
+        send: ASGI send callable
+        content_type: Response content type
+        chunks: Async iterator of bytes to send
+        extra_headers: Additional (name, value) byte pairs
+    """
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', content_type.encode()), *extra_headers]
+    })
+
+    async def pump():
+        try:
+            async for chunk in chunks:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            # Run the generator's cleanup now rather than when it is collected
+            await chunks.aclose()
+
+    pump_task = asyncio.create_task(pump())
+    disconnect_task = asyncio.create_task(_wait_for_disconnect(receive))
+    done, pending = await asyncio.wait(
+        {pump_task, disconnect_task},
+        return_when=asyncio.FIRST_COMPLETED
+    )
+    for task in pending:
+        task.cancel()
+    if pump_task in done:
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+async def _video_frames(camera, variant, max_fps):
+    """Async version of CameraHandler.generate_frames"""
+    loop = asyncio.get_running_loop()
+    min_interval = 1.0 / max_fps if max_fps else 0.0
+    with camera.watching(variant[2]):
+        async for frame in camera.broadcaster.subscribe_async():
+            sent_at = loop.time()
+            part = frame.get_cached(variant)
+            if part is None:
+                # Encoding is CPU work, keep it off the event loop
+                part = await asyncio.to_thread(frame.get, variant)
+                if part is None:
+                    continue
+            send_started = loop.time()
+            yield part
+            camera.timings['send'].observe(loop.time() - send_started)
+
+            remaining = min_interval - (loop.time() - sent_at)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+
+async def _alert_events(detection, last_event_id):
+    """Async version of routes.generate_alert_events"""
+    last_event_id, messages = start_alert_stream(detection, last_event_id)
+    for message in messages:
+        yield message.encode()
+    async for message in _events(detection.events, last_event_id):
+        yield message
+
+
+async def _events(events, last_event_id):
+    """Async version of routes.generate_events"""
+    while True:
+        new_events = await events.wait_for_events_async(last_event_id, ALERT_STREAM_HEARTBEAT)
+        if not new_events:
+            yield b": heartbeat\n\n"
+            continue
+        for event_id, message in new_events:
+            last_event_id = event_id
+            yield message.encode()
+
+
+class StreamingApp:
+    """ASGI app serving streaming routes natively and the rest through Flask"""
+
+    def __init__(self, flask_app):
+        """
+        Initialize the app
+
+        Args:
+            flask_app: Flask app handling all non-streaming routes
+        """
+        self.fallback = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        parts = [part for part in scope['path'].split('/') if part]
+        if parts and parts[0] == 'video_feed' and len(parts) <= 2:
+            await self._video_feed(scope, receive, send, *parts[1:])
+        elif parts and parts[0] == 'get_alerts' and len(parts) <= 2:
+            await self._get_alerts(scope, receive, send, *parts[1:])
+        elif parts[:2] == ['alerts', 'stream'] and len(parts) <= 3:
+            await self._alerts_stream(scope, receive, send, *parts[2:])
+        elif parts[:2] == ['frames', 'stream'] and len(parts) <= 3:
+            await self._frames_stream(scope, receive, send, *parts[2:])
+        else:
+            await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        """Acknowledge server startup and shutdown"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _video_feed(self, scope, receive, send, camera_id=None):
+        """Stream video feed with object detection"""
+        camera = await _get_camera(camera_id)
+        if camera is None:
+            await _send_json(send, {'error': f"Unknown camera '{camera_id}'"}, 404)
+            return
+        if await _send_if_warming_up(send):
+            return
+        query = parse_qs(scope.get('query_string', b'').decode())
+        variant, max_fps = parse_stream_options(
+            *(query.get(name, [None])[0] for name in ('quality', 'scale', 'max_fps', 'raw'))
+        )
+        camera.start()
+        await _stream(
+            receive, send,
+            'multipart/x-mixed-replace; boundary=frame',
+            _video_frames(camera, variant, max_fps)
+        )
+
+    async def _get_alerts(self, scope, receive, send, camera_id=None):
+        """Get current alerts from the detection system"""
+        camera = await _get_camera(camera_id)
+        if camera is None:
+            await _send_json(send, {'error': f"Unknown camera '{camera_id}'"}, 404)
+            return
+        if await _send_if_warming_up(send):
+            return
+        await _send_json(send, camera.detection.get_alerts_summary())
+
+    async def _alerts_stream(self, scope, receive, send, camera_id=None):
+        """Push alert episode changes to the client as Server-Sent Events"""
+        camera = await _get_camera(camera_id)
+        if camera is None:
+            await _send_json(send, {'error': f"Unknown camera '{camera_id}'"}, 404)
+            return
+
+        await _stream(
+            receive, send,
+            'text/event-stream',
+            _alert_events(camera.detection, _parse_last_event_id(scope)),
+            extra_headers=[(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]
+        )
+
+    async def _frames_stream(self, scope, receive, send, camera_id=None):
+        """Push one metadata record per published frame as Server-Sent Events"""
+        camera = await _get_camera(camera_id)
+        if camera is None:
+            await _send_json(send, {'error': f"Unknown camera '{camera_id}'"}, 404)
+            return
+        if await _send_if_warming_up(send):
+            return
+
+        camera.start()
+        last_event_id = start_frame_stream(camera.frame_events, _parse_last_event_id(scope))
+        await _stream(
+            receive, send,
+            'text/event-stream',
+            _events(camera.frame_events, last_event_id),
+            extra_headers=[(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]
+        )
+
+
+def create_asgi_app():
+    """Create the ASGI application wrapping the Flask app"""
+    return StreamingApp(create_app())
@@ -0,0 +1,296 @@
+"""
+Inference backends: PyTorch weights, or a cached ONNX Runtime export of them
+"""
+import os
+import json
+from functools import partial
+import cv2
+import numpy as np
+from ultralytics import YOLO
+from config import MODEL_PATH, INFERENCE_THREADS, INFERENCE_IMGSZ
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+# ultralytics predict defaults, so the ONNX backends keep the same boxes
+# the PyTorch backend hands to extract_detections
+EXPORT_IMGSZ = 640
+NMS_CONFIDENCE = 0.25
+NMS_IOU = 0.7
+MAX_DETECTIONS = 300
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+class DetectionBoxes:
+    """Boxes of one image, laid out like ultralytics Boxes.data"""
+
+    def __init__(self, data):
+        """
+        Args:
+            data: float32 array of rows [x1, y1, x2, y2, conf, cls]
+        """
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+
+class DetectionResult:
+    """Detections for one frame, in the shape extract_detections consumes"""
+
+    def __init__(self, data):
+        self.boxes = DetectionBoxes(data)
+
+
+class OnnxDetector:
+    """Runs an exported YOLOv8 detection model with ONNX Runtime"""
+
+    def __init__(self, path, class_names, imgsz=INFERENCE_IMGSZ):
+        """
+        Initialize the session
+
+        Args:
+            path: Path to the .onnx file
+            class_names: Class names indexed by class ID
+            imgsz: Longest side of the network input for dynamic exports
+        """
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if INFERENCE_THREADS:
+            options.intra_op_num_threads = INFERENCE_THREADS
+        self.session = onnxruntime.InferenceSession(
+            path, options, providers=['CPUExecutionProvider']
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.names = dict(enumerate(class_names))
+        self.imgsz = imgsz
+
+        # Static exports need the exact square size; dynamic ones take any
+        # stride-aligned shape, like the PyTorch backend's rectangular inference
+        height, width = model_input.shape[2:]
+        self.fixed_shape = (height, width) if isinstance(height, int) and isinstance(width, int) else None
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+
+    def _input_shape(self, frame_shape):
+        """Network input (height, width) for a frame"""
+        if self.fixed_shape is not None:
+            return self.fixed_shape
+        gain = self.imgsz / max(frame_shape[:2])
+        return tuple(int(np.ceil(round(side * gain) / 32) * 32) for side in frame_shape[:2])
+
+    def _letterbox(self, frame, shape):
+        """
+        Resize keeping the aspect ratio and pad to the network input
+
+        Returns:
+            tuple: (CHW float32 RGB image, gain, (pad_x, pad_y))
+        """
+        height, width = frame.shape[:2]
+        gain = min(shape[0] / height, shape[1] / width)
+        new_w, new_h = round(width * gain), round(height * gain)
+        pad_x, pad_y = (shape[1] - new_w) / 2, (shape[0] - new_h) / 2
+
+        if (new_w, new_h) != (width, height):
+            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+        left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+        frame = cv2.copyMakeBorder(frame, top, bottom, left, right,
+                                   cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+
+        # BGR HWC uint8 -> RGB CHW float in [0, 1]
+        image = frame[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+        return image, gain, (left, top)
+
+    def _postprocess(self, prediction, gain, pad, frame_shape):
+        """
+        Turn raw network output for one image into [x1, y1, x2, y2, conf, cls] rows
+
+        Args:
+            prediction: Array of shape (4 + classes, anchors), boxes as cx, cy, w, h
+            gain: Letterbox resize factor
+            pad: Letterbox (left, top) padding
+            frame_shape: Shape of the original frame
+        """
+        prediction = prediction.T
+        scores = prediction[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences > NMS_CONFIDENCE
+        if not keep.any():
+            return np.zeros((0, 6), dtype=np.float32)
+
+        boxes = prediction[keep, :4]
+        confidences = confidences[keep]
+        class_ids = class_ids[keep]
+
+        # Per-class NMS on (x, y, w, h) boxes
+        xywh = boxes.copy()
+        xywh[:, :2] -= xywh[:, 2:] / 2
+        indices = cv2.dnn.NMSBoxesBatched(xywh.tolist(), confidences.tolist(),
+                                          class_ids.tolist(), NMS_CONFIDENCE, NMS_IOU)
+        indices = np.asarray(indices, dtype=np.intp).reshape(-1)
+        indices = indices[np.argsort(-confidences[indices])][:MAX_DETECTIONS]
+
+        # Back to original frame coordinates
+        xyxy = np.empty((len(indices), 4), dtype=np.float32)
+        xyxy[:, :2] = xywh[indices, :2]
+        xyxy[:, 2:] = xywh[indices, :2] + xywh[indices, 2:]
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad[0]) / gain).clip(0, frame_shape[1])
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad[1]) / gain).clip(0, frame_shape[0])
+
+        return np.column_stack((xyxy, confidences[indices],
+                                class_ids[indices])).astype(np.float32)
+
+    def __call__(self, frames):
+        """
+        Run detection on one frame or a list of frames
+
+        Args:
+            frames: BGR frame or list of BGR frames
+
+        Returns:
+            list: One DetectionResult per frame
+        """
+        if not isinstance(frames, list):
+            frames = [frames]
+
+        # Frames that letterbox to the same input shape share one session run
+        groups = {}
+        for index, frame in enumerate(frames):
+            groups.setdefault(self._input_shape(frame.shape), []).append(index)
+
+        results = [None] * len(frames)
+        for shape, indices in groups.items():
+            step = self.fixed_batch or len(indices)
+            for start in range(0, len(indices), step):
+                chunk = indices[start:start + step]
+                letterboxed = [self._letterbox(frames[index], shape) for index in chunk]
+                batch = np.stack([image for image, _, _ in letterboxed])
+                output = self.session.run(None, {self.input_name: batch})[0]
+                for index, prediction, (_, gain, pad) in zip(chunk, output, letterboxed):
+                    results[index] = DetectionResult(
+                        self._postprocess(prediction, gain, pad, frames[index].shape)
+                    )
+        return results
+
+
+def get_export_path(backend, model_path=MODEL_PATH):
+    """
+    Get where the model file for a backend is cached
+
+    Exports sit next to the weights, e.g. my_model4.onnx and
+    my_model4.int8.onnx for my_model4.pt.
+
+    Args:
+        backend: One of BACKENDS
+        model_path: Path to the PyTorch weights
+
+    Returns:
+        str: Path of the model file the backend loads
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    base = os.path.splitext(model_path)[0]
+    if backend == 'torch':
+        return model_path
+    if backend == 'onnx':
+        return base + '.onnx'
+    if backend == 'onnx-int8':
+        return base + '.int8.onnx'
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+
+def _names_path(export_path):
+    """Path of the class names saved alongside an export"""
+    return export_path + '.names.json'
+
+
+def _is_stale(export_path, model_path):
+    """Whether an export is missing or older than the weights it came from"""
+    return (not os.path.exists(export_path)
+            or not os.path.exists(_names_path(export_path))
+            or os.path.getmtime(export_path) < os.path.getmtime(model_path))
+
+
+def _get_class_names(model):
+    """Class names of an ultralytics model as a list indexed by class ID"""
+    names = model.names
+    if isinstance(names, dict):
+        names = [names[class_id] for class_id in sorted(names)]
+    return list(names)
+
+
+def _export_onnx(model_path):
+    """Export the weights to ONNX with dynamic batch and image axes"""
+    export_path = get_export_path('onnx', model_path)
+    model = YOLO(model_path)
+    model.export(format='onnx', imgsz=EXPORT_IMGSZ, dynamic=True)
+    if not os.path.exists(export_path):
+        raise RuntimeError(f"ONNX export did not produce {export_path}")
+
+    # The exported graph carries no class names, keep the ones from the weights
+    with open(_names_path(export_path), 'w') as f:
+        json.dump(_get_class_names(model), f)
+    return export_path
+
+
+def _export_onnx_int8(model_path):
+    """Quantize the weights of the ONNX export to INT8"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    onnx_path = get_export_path('onnx', model_path)
+    if _is_stale(onnx_path, model_path):
+        _export_onnx(model_path)
+
+    export_path = get_export_path('onnx-int8', model_path)
+    quantize_dynamic(onnx_path, export_path, weight_type=QuantType.QUInt8)
+    with open(_names_path(onnx_path)) as src, open(_names_path(export_path), 'w') as dst:
+        dst.write(src.read())
+    return export_path
+
+
+def export_model(backend, model_path=MODEL_PATH):
+    """
+    Convert the weights for a backend, reusing the cached export if current
+
+    Args:
+        backend: One of BACKENDS
+        model_path: Path to the PyTorch weights
+
+    Returns:
+        str: Path of the model file the backend loads
+    """
+    export_path = get_export_path(backend, model_path)
+    if backend == 'torch' or not _is_stale(export_path, model_path):
+        return export_path
+
+    print(f"Exporting {model_path} for the '{backend}' backend (first run only)...")
+    if backend == 'onnx':
+        return _export_onnx(model_path)
+    return _export_onnx_int8(model_path)
+
+
+def load_backend(backend, model_path=MODEL_PATH, imgsz=INFERENCE_IMGSZ):
+    """
+    Load the detector for a backend, exporting the weights first if needed
+
+    Args:
+        backend: One of BACKENDS
+        model_path: Path to the PyTorch weights
+        imgsz: Longest side of the network input
+
+    Returns:
+        tuple: (callable taking a frame or list of frames and returning
+            results with boxes.data rows [x1, y1, x2, y2, conf, cls],
+            list of class names indexed by class ID)
+    """
+    export_path = export_model(backend, model_path)
+    if backend == 'torch':
+        model = YOLO(export_path)
+        return partial(model, imgsz=imgsz), _get_class_names(model)
+
+    with open(_names_path(export_path)) as f:
+        class_names = json.load(f)
+    return OnnxDetector(export_path, class_names, imgsz), class_names
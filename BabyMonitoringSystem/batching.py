@@ -0,0 +1,77 @@
+"""
+Batched inference shared by all cameras
+"""
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from models import get_model
+from config import BATCH_WAIT
+
+
+class InferenceBatcher:
+    """Collects frames from every camera and runs them through one detect call"""
+
+    def __init__(self, max_batch_size):
+        """
+        Initialize the batcher
+
+        Args:
+            max_batch_size: Largest batch to build, normally the number of cameras
+        """
+        self.model = None
+        self.max_batch_size = max(1, max_batch_size)
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="inference-batcher",
+            daemon=True
+        )
+        self._thread.start()
+
+    def detect(self, frame):
+        """
+        Queue a frame for the next batch and wait for its results
+
+        Args:
+            frame: Input image frame
+
+        Returns:
+            Detection results from YOLO for this frame only
+        """
+        future = Future()
+        self._requests.put((frame, future))
+        return future.result()
+
+    def _collect_batch(self):
+        """Wait for one request, then gather others arriving within BATCH_WAIT"""
+        batch = [self._requests.get()]
+        deadline = time.perf_counter() + BATCH_WAIT
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Run batched detection until the process exits"""
+        while True:
+            batch = self._collect_batch()
+            frames = [frame for frame, _ in batch]
+            try:
+                if self.model is None:
+                    # Waits for the background load started at app startup
+                    self.model = get_model()
+                results = self.model.detect_batch(frames)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            # Route each result back to the camera that submitted the frame
+            for (_, future), result in zip(batch, results):
+                future.set_result([result])
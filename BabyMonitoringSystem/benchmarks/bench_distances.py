@@ -0,0 +1,100 @@
+"""
+Benchmark: per-pair distance loop vs vectorized distance matrix
+
+Run from the BabyMonitoringSystem directory:
+
+    python benchmarks/bench_distances.py
+"""
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CRITICAL_DISTANCE, WARNING_DISTANCE
+from utils import calculate_distance, calculate_distance_matrix
+
+
+def make_scene(num_babies, num_hazards, rng):
+    """Create random baby boxes and hazard detections on a 640x480 frame"""
+    def boxes(count):
+        x1 = rng.uniform(0, 560, count)
+        y1 = rng.uniform(0, 400, count)
+        w = rng.uniform(20, 80, count)
+        h = rng.uniform(20, 80, count)
+        return np.stack([x1, y1, x1 + w, y1 + h], axis=1).tolist()
+
+    baby_boxes = boxes(num_babies)
+    hazard_boxes = [
+        {'bbox': bbox, 'name': 'hazard', 'confidence': 0.9}
+        for bbox in boxes(num_hazards)
+    ]
+    return baby_boxes, hazard_boxes
+
+
+def loop_distances(baby_boxes, hazard_boxes):
+    """Previous implementation: one calculate_distance call and dict per pair"""
+    distance_data = []
+    for baby_box in baby_boxes:
+        for hazard in hazard_boxes:
+            hazard_box = hazard['bbox']
+            distance, baby_center, hazard_center = calculate_distance(baby_box, hazard_box)
+
+            color = (0, 255, 0)
+            alert_level = "SAFE"
+            if distance < CRITICAL_DISTANCE:
+                color = (0, 0, 255)
+                alert_level = "CRITICAL"
+            elif distance < WARNING_DISTANCE:
+                color = (0, 165, 255)
+                alert_level = "WARNING"
+
+            distance_data.append({
+                'baby_center': baby_center,
+                'hazard_center': hazard_center,
+                'distance': distance,
+                'color': color,
+                'alert_level': alert_level,
+                'hazard_box': hazard_box
+            })
+    return distance_data
+
+
+def vectorized_distances(baby_boxes, hazard_boxes):
+    """Current implementation: distance matrix and level masks"""
+    distances, baby_centers, hazard_centers = calculate_distance_matrix(
+        baby_boxes, [hazard['bbox'] for hazard in hazard_boxes]
+    )
+    levels = np.zeros(distances.shape, dtype=np.int8)
+    levels[distances < WARNING_DISTANCE] = 1
+    levels[distances < CRITICAL_DISTANCE] = 2
+    return distances, levels, baby_centers.astype(np.int32), hazard_centers.astype(np.int32)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'babies':>6} {'hazards':>8} {'loop (us)':>12} {'numpy (us)':>12} {'speedup':>8}")
+    for num_babies, num_hazards in [(1, 3), (1, 20), (2, 50), (3, 100), (4, 250)]:
+        baby_boxes, hazard_boxes = make_scene(num_babies, num_hazards, rng)
+
+        # Both paths must agree before timing them
+        reference = loop_distances(baby_boxes, hazard_boxes)
+        distances, _, _, _ = vectorized_distances(baby_boxes, hazard_boxes)
+        assert np.allclose(
+            [d['distance'] for d in reference], distances.ravel(), rtol=1e-4
+        )
+
+        number = 200
+        loop_time = timeit.timeit(
+            lambda: loop_distances(baby_boxes, hazard_boxes), number=number
+        ) / number
+        numpy_time = timeit.timeit(
+            lambda: vectorized_distances(baby_boxes, hazard_boxes), number=number
+        ) / number
+        print(f"{num_babies:>6} {num_hazards:>8} {loop_time * 1e6:>12.1f} "
+              f"{numpy_time * 1e6:>12.1f} {loop_time / numpy_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
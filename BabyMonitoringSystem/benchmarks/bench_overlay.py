@@ -0,0 +1,156 @@
+"""
+Benchmark: drawing the stream overlay
+
+Compares ultralytics' results[0].plot() plus the distance/status text drawn
+on top (the previous path) against OverlayRenderer, with and without its
+label glyph cache. The plot() row is skipped when ultralytics and torch
+are not installed; the "putText" row replays the previous drawing code
+without plot(), as drawn on frames that skipped inference.
+
+Run from the BabyMonitoringSystem directory:
+
+    python benchmarks/bench_overlay.py
+"""
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import FRAME_WIDTH, FRAME_HEIGHT, CRITICAL_DISTANCE, WARNING_DISTANCE
+from detection import ALERT_LEVELS, ALERT_COLORS
+from overlay import OverlayRenderer
+from utils import calculate_distance_matrix
+
+FRAMES = 500
+NAMES = {0: 'baby', 1: 'knife', 2: 'scissors', 3: 'bottle'}
+
+
+def make_scene():
+    """One baby and three hazards, plus the distance arrays for them"""
+    baby_boxes = [[120, 140, 260, 330]]
+    hazard_boxes = [
+        {'bbox': [300, 200, 360, 260], 'name': 'knife', 'confidence': 0.82, 'track_id': 3},
+        {'bbox': [420, 80, 480, 150], 'name': 'scissors', 'confidence': 0.67, 'track_id': 4},
+        {'bbox': [500, 320, 560, 420], 'name': 'bottle', 'confidence': 0.91, 'track_id': 5},
+    ]
+    distances, baby_centers, hazard_centers = calculate_distance_matrix(
+        baby_boxes, [hazard['bbox'] for hazard in hazard_boxes]
+    )
+    levels = np.where(distances <= CRITICAL_DISTANCE, 2,
+                      np.where(distances <= WARNING_DISTANCE, 1, 0)).astype(np.int8)
+    distance_data = {
+        'distances': distances,
+        'levels': levels,
+        'baby_centers': baby_centers.astype(np.int32),
+        'hazard_centers': hazard_centers.astype(np.int32)
+    }
+    return baby_boxes, hazard_boxes, distance_data
+
+
+def draw_previous(image, baby_boxes, hazard_boxes, distance_data, timestamp):
+    """Distance lines and status text as drawn before the renderer"""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    for baby_index, hazard_index in np.ndindex(distance_data['distances'].shape):
+        level = distance_data['levels'][baby_index, hazard_index]
+        color = ALERT_COLORS[level]
+        baby_center = tuple(distance_data['baby_centers'][baby_index].tolist())
+        hazard_center = tuple(distance_data['hazard_centers'][hazard_index].tolist())
+        cv2.line(image, baby_center, hazard_center, color, 2)
+        mid_point = ((baby_center[0] + hazard_center[0]) // 2,
+                     (baby_center[1] + hazard_center[1]) // 2)
+        cv2.putText(image, f"{distance_data['distances'][baby_index, hazard_index]:.1f}px",
+                    (mid_point[0], mid_point[1] - 10), font, 0.6, color, 2)
+        x1, y1 = map(int, hazard_boxes[hazard_index]['bbox'][:2])
+        cv2.putText(image, ALERT_LEVELS[level], (x1, y1 - 30), font, 0.6, color, 2)
+    cv2.putText(image, f"Baby: {len(baby_boxes)} | Hazards: {len(hazard_boxes)} | Critical: 1",
+                (10, 30), font, 0.7, (0, 255, 0), 2)
+    cv2.putText(image, "1 CRITICAL ALERT(S)!", (10, 60), font, 0.8, (0, 0, 255), 2)
+    cv2.putText(image, timestamp, (image.shape[1] - 120, 30), font, 0.6, (255, 255, 255), 2)
+
+
+def draw_boxes_previous(image, baby_boxes, hazard_boxes):
+    """Box drawing used before the renderer on frames that skipped inference"""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    for bbox in baby_boxes:
+        x1, y1, x2, y2 = bbox
+        cv2.rectangle(image, (x1, y1), (x2, y2), (255, 128, 0), 2)
+        cv2.putText(image, "baby", (x1, y1 - 8), font, 0.6, (255, 128, 0), 2)
+    for hazard in hazard_boxes:
+        x1, y1, x2, y2 = hazard['bbox']
+        cv2.rectangle(image, (x1, y1), (x2, y2), (0, 165, 255), 2)
+        cv2.putText(image, f"#{hazard['track_id']} {hazard['name']} {hazard['confidence']:.2f}",
+                    (x1, y1 - 8), font, 0.6, (0, 165, 255), 2)
+
+
+def make_plot_func(source, baby_boxes, hazard_boxes, distance_data):
+    """Build the plot() path, or None if ultralytics is not installed"""
+    try:
+        import torch
+        try:
+            from ultralytics.engine.results import Results
+        except ImportError:
+            from ultralytics.yolo.engine.results import Results
+    except ImportError:
+        return None
+
+    rows = [[*bbox, 0.88, 0] for bbox in baby_boxes]
+    class_ids = {name: class_id for class_id, name in NAMES.items()}
+    rows += [[*hazard['bbox'], hazard['confidence'], class_ids[hazard['name']]]
+             for hazard in hazard_boxes]
+    result = Results(source, path='bench', names=NAMES,
+                     boxes=torch.tensor(rows, dtype=torch.float32))
+
+    def plot_path(frame):
+        annotated = result.plot()
+        draw_previous(annotated, baby_boxes, hazard_boxes, distance_data, time.strftime("%H:%M:%S"))
+        return annotated
+    return plot_path
+
+
+def measure(name, func, source):
+    """Report mean and p95 draw time over FRAMES frames"""
+    frame = source.copy()
+    func(frame)  # warm up
+    latencies = []
+    for _ in range(FRAMES):
+        np.copyto(frame, source)
+        started = time.perf_counter()
+        func(frame)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(f"{name:<16} {1000 * sum(latencies) / FRAMES:>9.3f} "
+          f"{1000 * latencies[int(len(latencies) * 0.95)]:>9.3f}")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    source = rng.integers(0, 255, (FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    baby_boxes, hazard_boxes, distance_data = make_scene()
+
+    cached = OverlayRenderer()
+    uncached = OverlayRenderer(cache_size=0)
+
+    def renderer_path(renderer):
+        return lambda frame: renderer.draw(frame, baby_boxes, hazard_boxes, distance_data,
+                                           1, True, time.strftime("%H:%M:%S"))
+
+    def puttext_path(frame):
+        draw_boxes_previous(frame, baby_boxes, hazard_boxes)
+        draw_previous(frame, baby_boxes, hazard_boxes, distance_data, time.strftime("%H:%M:%S"))
+
+    print(f"{'path':<16} {'mean ms':>9} {'p95 ms':>9}")
+    plot_path = make_plot_func(source, baby_boxes, hazard_boxes, distance_data)
+    if plot_path is None:
+        print(f"{'plot()':<16} {'skipped: ultralytics not installed':>19}")
+    else:
+        measure('plot()', plot_path, source)
+    measure('putText', puttext_path, source)
+    measure('renderer', renderer_path(uncached), source)
+    measure('renderer+cache', renderer_path(cached), source)
+
+
+if __name__ == '__main__':
+    main()
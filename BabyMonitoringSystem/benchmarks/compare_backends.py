@@ -0,0 +1,152 @@
+"""
+Benchmark: latency and agreement of the inference backends
+
+Runs the same frames through every backend in backends.BACKENDS (exporting
+the weights on first use) and compares each one against the PyTorch
+backend: boxes are matched per class at IoU >= 0.5, and the script reports
+how many reference boxes were found (recall), how many extra boxes appeared
+(precision), the mean IoU and confidence difference of matched boxes, and
+single-frame latency.
+
+Frames come from a video file, a directory of images, or the camera:
+
+    python benchmarks/compare_backends.py --source clip.mp4 --frames 200
+    python benchmarks/compare_backends.py --source frames/
+    python benchmarks/compare_backends.py --backends torch,onnx
+    python benchmarks/compare_backends.py --imgsz 320 --roi 80,40,560,440
+"""
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import BACKENDS, load_backend
+from tracking import box_iou
+from utils import crop_roi
+from config import CAMERA_INDEX, MODEL_PATH, INFERENCE_IMGSZ, CRIB_ROI
+
+MATCH_IOU = 0.5
+
+
+def read_frames(source, count):
+    """Read up to count frames from a video, image directory or camera index"""
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source)
+                       if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+        frames = [cv2.imread(os.path.join(source, name)) for name in names[:count]]
+        return [frame for frame in frames if frame is not None]
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < count:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def to_rows(result):
+    """Detections of one result as an [x1, y1, x2, y2, conf, cls] array"""
+    data = result.boxes.data
+    if not isinstance(data, np.ndarray):
+        data = data.cpu().numpy()
+    return data
+
+
+def match(reference, candidate):
+    """
+    Greedily match boxes of the same class by IoU, highest confidence first
+
+    Returns:
+        list: (reference row, candidate row, IoU) for each matched pair
+    """
+    pairs = []
+    used = set()
+    for ref in reference[np.argsort(-reference[:, 4])]:
+        best, best_iou = None, MATCH_IOU
+        for index, box in enumerate(candidate):
+            if index in used or box[5] != ref[5]:
+                continue
+            iou = box_iou(ref[:4], box[:4])
+            if iou >= best_iou:
+                best, best_iou = index, iou
+        if best is not None:
+            used.add(best)
+            pairs.append((ref, candidate[best], best_iou))
+    return pairs
+
+
+def run_backend(backend, frames, imgsz):
+    """Run every frame through a backend, returning detections and latencies"""
+    detector, _ = load_backend(backend, MODEL_PATH, imgsz)
+    for frame in frames[:3]:
+        detector(frame)  # warm up
+
+    detections, latencies = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        results = detector(frame)
+        latencies.append(time.perf_counter() - started)
+        detections.append(to_rows(results[0]))
+    return detections, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--source', default=str(CAMERA_INDEX),
+                        help='video file, image directory or camera index')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help='comma-separated backends; torch is always the reference')
+    parser.add_argument('--imgsz', type=int, default=INFERENCE_IMGSZ,
+                        help='longest side of the network input')
+    parser.add_argument('--roi', default=','.join(map(str, CRIB_ROI)) if CRIB_ROI else '',
+                        help='x1,y1,x2,y2 crop to run detection on, empty for the whole frame')
+    args = parser.parse_args()
+
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        sys.exit(f"No frames read from {args.source}")
+    roi = tuple(int(value) for value in args.roi.split(',')) if args.roi else None
+    frames = [crop_roi(frame, roi)[0] for frame in frames]
+
+    backends = [name for name in args.backends.split(',') if name != 'torch']
+    reference, reference_latencies = run_backend('torch', frames, args.imgsz)
+    reference_boxes = sum(len(rows) for rows in reference)
+
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]} at imgsz "
+          f"{args.imgsz}, {reference_boxes} reference boxes\n")
+    print(f"{'backend':<10} {'mean ms':>8} {'p95 ms':>8} {'recall':>7} "
+          f"{'precision':>9} {'mean IoU':>8} {'conf diff':>9}")
+
+    def report(name, latencies, recall, precision, mean_iou, conf_diff):
+        latencies = sorted(latencies)
+        print(f"{name:<10} {1000 * np.mean(latencies):>8.1f} "
+              f"{1000 * latencies[int(len(latencies) * 0.95)]:>8.1f} "
+              f"{recall:>7.3f} {precision:>9.3f} {mean_iou:>8.3f} {conf_diff:>9.3f}")
+
+    report('torch', reference_latencies, 1.0, 1.0, 1.0, 0.0)
+    for backend in backends:
+        detections, latencies = run_backend(backend, frames, args.imgsz)
+        pairs = []
+        for ref_rows, rows in zip(reference, detections):
+            pairs.extend(match(ref_rows, rows))
+        found = sum(len(rows) for rows in detections)
+        report(
+            backend,
+            latencies,
+            len(pairs) / reference_boxes if reference_boxes else 1.0,
+            len(pairs) / found if found else 1.0,
+            np.mean([iou for _, _, iou in pairs]) if pairs else 0.0,
+            np.mean([abs(ref[4] - box[4]) for ref, box, _ in pairs]) if pairs else 0.0
+        )
+
+
+if __name__ == '__main__':
+    main()
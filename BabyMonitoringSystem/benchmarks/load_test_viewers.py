@@ -0,0 +1,133 @@
+"""
+Load test: how many concurrent /video_feed viewers a running server sustains
+
+Start the server in one mode, run this script, then repeat with the other
+mode and compare the tables:
+
+    # SERVER_MODE = 'threaded' in config.py
+    python main.py
+    python benchmarks/load_test_viewers.py --viewers 10,50,100,200
+
+    # SERVER_MODE = 'asgi' in config.py
+    python main.py
+    python benchmarks/load_test_viewers.py --viewers 10,50,100,200
+
+Each viewer is a raw asyncio connection, so the client side needs no extra
+dependencies and uses no threads. Works against a real camera or a replayed
+video source.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+BOUNDARY = b'--frame\r\n'
+
+async def run_viewer(host, port, path, duration, stats):
+    """Open one MJPEG connection and count the frames received"""
+    started = time.perf_counter()
+    frames = 0
+    first_frame = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=10
+        )
+    except (OSError, asyncio.TimeoutError):
+        stats['failed'] += 1
+        return
+
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+
+    tail = b''
+    deadline = started + duration
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            chunk = await asyncio.wait_for(reader.read(65536), timeout=remaining)
+            if not chunk:
+                break
+            # Keep a tail one byte shorter than the boundary, so a boundary
+            # split across reads is counted once and a whole one is not
+            # counted again on the next read
+            data = tail + chunk
+            frames += data.count(BOUNDARY)
+            tail = data[-(len(BOUNDARY) - 1):]
+            if frames and first_frame is None:
+                first_frame = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        pass
+    except OSError:
+        stats['failed'] += 1
+    finally:
+        writer.close()
+
+    if frames == 0:
+        stats['starved'] += 1
+    else:
+        stats['fps'].append(frames / duration)
+        stats['first_frame'].append(first_frame)
+
+
+async def fetch_status(host, port):
+    """Read /status from the server, None if unavailable"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET /status HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return json.loads(response.split(b'\r\n\r\n', 1)[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def run_level(host, port, path, viewers, duration):
+    """Run one concurrency level and return its statistics"""
+    stats = {'failed': 0, 'starved': 0, 'fps': [], 'first_frame': []}
+    tasks = [
+        asyncio.create_task(run_viewer(host, port, path, duration, stats))
+        for _ in range(viewers)
+    ]
+    await asyncio.sleep(duration / 2)
+    status = await fetch_status(host, port)
+    await asyncio.gather(*tasks)
+    stats['server_fps'] = status['fps']['achieved'] if status else None
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default='http://127.0.0.1:5001/video_feed',
+                        help='stream to open, query string included')
+    parser.add_argument('--viewers', default='10,50,100,200',
+                        help='comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='seconds each level runs')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    host, port, path = url.hostname, url.port or 80, url.path or '/'
+    if url.query:
+        # Keep stream options such as ?quality=50&max_fps=5
+        path += '?' + url.query
+
+    print(f"{'viewers':>8} {'served':>7} {'failed':>7} {'starved':>8} "
+          f"{'fps/viewer':>11} {'first frame':>12} {'server fps':>11}")
+    for viewers in [int(v) for v in args.viewers.split(',')]:
+        stats = await run_level(host, port, path, viewers, args.duration)
+        served = len(stats['fps'])
+        fps = statistics.median(stats['fps']) if stats['fps'] else 0.0
+        first = statistics.median(stats['first_frame']) if stats['first_frame'] else 0.0
+        print(f"{viewers:>8} {served:>7} {stats['failed']:>7} {stats['starved']:>8} "
+              f"{fps:>11.1f} {first * 1000:>10.0f}ms {stats['server_fps'] or 0:>11.1f}")
+        # Let the server release the previous level's connections
+        await asyncio.sleep(2)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Benchmark: replay recorded footage through the full streaming pipeline
+
+Feeds a video file or image directory through the same capture ->
+inference -> annotate -> encode pipeline and generate_frames() viewers the
+server uses, with frame pacing off, and reports end-to-end FPS, p50/p99
+latency of every timed step, dropped frames and memory. Runs headless and
+on CPU, so it can gate deployments in CI:
+
+    python benchmarks/replay_pipeline.py --source clip.mp4
+    python benchmarks/replay_pipeline.py --synthetic 300 --json baseline.json
+    python benchmarks/replay_pipeline.py --synthetic 300 --baseline baseline.json
+
+With --baseline the script exits with status 1 when FPS drops, or a step's
+p99 latency grows, by more than --tolerance compared with the saved run.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import threading
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+CAMERA_ID = 'replay'
+# Steps faster than this are too noisy to fail a build on
+MIN_GATED_P99_MS = 1.0
+
+
+def write_synthetic_frames(directory, count):
+    """Write a clip of boxes moving over a noisy background"""
+    rng = np.random.default_rng(0)
+    background = rng.integers(60, 120, (config.FRAME_HEIGHT, config.FRAME_WIDTH, 3), dtype=np.uint8)
+    for index in range(count):
+        frame = background.copy()
+        x = 40 + (index * 7) % (config.FRAME_WIDTH - 200)
+        cv2.rectangle(frame, (x, 150), (x + 120, 330), (200, 180, 170), -1)
+        cv2.rectangle(frame, (400, 200 + index % 60), (460, 260 + index % 60), (30, 30, 200), -1)
+        cv2.imwrite(os.path.join(directory, f"{index:06d}.jpg"), frame)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024 if sys.platform != 'darwin' else peak / (1024 * 1024)
+
+
+def run(source, viewers):
+    """Replay a source and return the measurements"""
+    # Configure before the pipeline modules read their settings
+    config.TARGET_FPS = 0
+    config.CAMERA_SOURCES = {CAMERA_ID: source}
+
+    from camera import get_camera_handler, TIMED_STEPS
+    from metrics import Histogram
+    from models import get_model
+
+    class RecordingHistogram(Histogram):
+        """Histogram that also keeps every sample for exact percentiles"""
+
+        def __init__(self):
+            super().__init__()
+            self.samples = []
+
+        def observe(self, value):
+            self.samples.append(value)
+            super().observe(value)
+
+    started = time.perf_counter()
+    get_model()
+    model_seconds = time.perf_counter() - started
+    rss_before = peak_rss_mb()
+
+    handler = get_camera_handler(CAMERA_ID)
+    handler.timings = {step: RecordingHistogram() for step in TIMED_STEPS}
+
+    received = [0] * viewers
+
+    def watch(index):
+        for _ in handler.generate_frames():
+            received[index] += 1
+
+    threads = [threading.Thread(target=watch, args=(index,)) for index in range(viewers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    pipeline = handler.get_pipeline_stats()
+    frames_out = pipeline['encode']['processed']
+    steps = {}
+    for step, histogram in handler.timings.items():
+        if histogram.samples:
+            samples = np.array(histogram.samples) * 1000
+            steps[step] = {
+                'count': len(samples),
+                'p50_ms': round(float(np.percentile(samples, 50)), 3),
+                'p99_ms': round(float(np.percentile(samples, 99)), 3)
+            }
+
+    return {
+        'source': source,
+        'viewers': viewers,
+        'frames_in': pipeline['capture']['processed'],
+        'frames_out': frames_out,
+        'frames_dropped': sum(stats.get('dropped', 0) for stats in pipeline.values()),
+        'frames_per_viewer': min(received),
+        'seconds': round(elapsed, 3),
+        'fps': round(frames_out / elapsed, 2) if elapsed else 0.0,
+        'model_load_seconds': round(model_seconds, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+        'buffer_allocations': handler.buffer_pool.allocations if handler.buffer_pool else 0,
+        'steps': steps
+    }
+
+
+def compare(result, baseline, tolerance):
+    """List regressions against a baseline run"""
+    failures = []
+    if result['fps'] < baseline['fps'] * (1 - tolerance):
+        failures.append(f"fps {result['fps']} < baseline {baseline['fps']}")
+    for step, stats in result['steps'].items():
+        base = baseline['steps'].get(step)
+        if base is None or base['p99_ms'] < MIN_GATED_P99_MS:
+            continue
+        if stats['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            failures.append(f"{step} p99 {stats['p99_ms']} ms > baseline {base['p99_ms']} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--source', help='video file or image directory')
+    source_group.add_argument('--synthetic', type=int, metavar='FRAMES',
+                              help='generate a synthetic clip of this many frames')
+    parser.add_argument('--viewers', type=int, default=1)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='results file of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative regression against the baseline')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = args.source
+        if args.synthetic:
+            write_synthetic_frames(directory, args.synthetic)
+            source = directory
+        result = run(source, args.viewers)
+
+    print(f"\n{result['frames_out']} of {result['frames_in']} frames in {result['seconds']} s: "
+          f"{result['fps']} FPS, {result['frames_dropped']} dropped, "
+          f"{result['frames_per_viewer']} per viewer")
+    print(f"peak RSS {result['peak_rss_mb']} MiB (+{result['rss_growth_mb']} MiB during replay), "
+          f"{result['buffer_allocations']} frame buffers\n")
+    print(f"{'step':<10} {'count':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for step, stats in result['steps'].items():
+        print(f"{step:<10} {stats['count']:>6} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(result, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Frame broadcasting from the capture loop to stream viewers
+"""
+import threading
+from notifier import AsyncNotifier
+
+
+class FrameBroadcaster:
+    """Holds the latest encoded frame and hands it to any number of viewers"""
+
+    def __init__(self):
+        """Initialize an empty broadcaster"""
+        self._condition = threading.Condition()
+        self._frame = None
+        self._sequence = 0
+        self._closed = False
+        self._async = AsyncNotifier()
+        self.viewer_count = 0
+
+    def publish(self, frame):
+        """
+        Replace the latest frame and wake up every waiting viewer
+
+        Args:
+            frame: Encoded frame to deliver
+
+        Returns:
+            The frame it replaced, or None
+        """
+        with self._condition:
+            previous = self._frame
+            self._frame = frame
+            self._sequence += 1
+            self._condition.notify_all()
+        self._async.notify_all()
+        return previous
+
+    def close(self):
+        """Stop the broadcast and release all waiting viewers"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._async.notify_all()
+
+    @property
+    def closed(self):
+        """Whether the producer has stopped"""
+        return self._closed
+
+    def wait_for_frame(self, last_sequence, timeout=None):
+        """
+        Wait for a frame newer than the one a viewer already has
+
+        Args:
+            last_sequence: Sequence number of the viewer's last frame
+            timeout: Maximum seconds to wait, or None to wait forever
+
+        Returns:
+            tuple: (sequence, frame), frame is None on timeout or close
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._closed or self._sequence != last_sequence,
+                timeout
+            )
+            if self._closed or self._sequence == last_sequence:
+                return last_sequence, None
+            return self._sequence, self._frame
+
+    def subscribe(self):
+        """
+        Iterate over frames as they are published
+
+        Viewers that fall behind skip straight to the latest frame, so a
+        slow client never holds up the producer or other viewers.
+
+        Yields:
+            Latest encoded frame
+        """
+        with self._condition:
+            self.viewer_count += 1
+        try:
+            sequence = 0
+            while True:
+                sequence, frame = self.wait_for_frame(sequence)
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            with self._condition:
+                self.viewer_count -= 1
+
+    async def wait_for_frame_async(self, last_sequence, timeout=None):
+        """Coroutine version of wait_for_frame for asyncio servers"""
+        await self._async.wait_for(
+            lambda: self._closed or self._sequence != last_sequence,
+            timeout
+        )
+        with self._condition:
+            if self._closed or self._sequence == last_sequence:
+                return last_sequence, None
+            return self._sequence, self._frame
+
+    async def subscribe_async(self):
+        """
+        Async iterator over published frames, skipping frames like subscribe()
+
+        Yields:
+            Latest encoded frame
+        """
+        with self._condition:
+            self.viewer_count += 1
+        try:
+            sequence = 0
+            while True:
+                sequence, frame = await self.wait_for_frame_async(sequence)
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            with self._condition:
+                self.viewer_count -= 1
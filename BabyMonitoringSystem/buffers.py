@@ -0,0 +1,61 @@
+"""
+Preallocated frame buffers reused across the capture pipeline
+"""
+import threading
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Pool of same-shaped image buffers
+
+    Capture reads straight into a pooled buffer, and the buffer goes back to
+    the pool once the last stage is done with it, so steady-state streaming
+    does not allocate a new frame array per frame.
+    """
+
+    def __init__(self, shape, size, dtype=np.uint8):
+        """
+        Initialize the pool
+
+        Args:
+            shape: Shape of every buffer, e.g. (480, 640, 3)
+            size: Number of buffers preallocated
+            dtype: Buffer element type
+        """
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self._free = [np.empty(self.shape, dtype) for _ in range(size)]
+        self._lock = threading.Lock()
+        self.allocations = size
+
+    def acquire(self):
+        """
+        Take a buffer from the pool
+
+        Allocates a new buffer when the pool is empty rather than blocking
+        the capture loop; the allocation count shows when the pool is too
+        small.
+
+        Returns:
+            numpy.ndarray: Buffer with undefined contents
+        """
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.allocations += 1
+        return np.empty(self.shape, self.dtype)
+
+    def release(self, buffer):
+        """Return a buffer to the pool"""
+        if buffer.shape != self.shape or buffer.dtype != self.dtype:
+            return
+        with self._lock:
+            self._free.append(buffer)
+
+    def get_stats(self):
+        """Get pool usage counters"""
+        return {
+            'free': len(self._free),
+            'allocations': self.allocations
+        }
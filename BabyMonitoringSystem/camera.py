@@ -2,129 +2,566 @@
 Camera and frame generation logic
 """
 import time
+import threading
+from contextlib import contextmanager
 import cv2
+import numpy as np
+from alert_log import get_alert_log
+from alerts import AlertEventBus
+from batching import InferenceBatcher
+from broadcaster import FrameBroadcaster
+from buffers import FrameBufferPool
+from clips import ClipRecorder, get_clip_writer
+from capture import open_capture, is_live_source
 from detection import DetectionProcessor
-from models import get_model
+from encoding import EncodedFrame, DEFAULT_VARIANT
+from metrics import Histogram, MetricFamily
+from models import is_model_ready
+from motion import MotionGate
+from overlay import OverlayRenderer
+from pacing import FramePacer
+from pipeline import FramePipeline
+from tracking import ObjectTracker
+from utils import crop_roi
 from config import (
-    CAMERA_INDEX,
+    CAMERA_SOURCES,
+    CRIB_ROI,
     FRAME_WIDTH,
     FRAME_HEIGHT,
-    FRAME_DELAY
+    TARGET_FPS,
+    PIPELINE_QUEUE_SIZE,
+    FRAME_POOL_SIZE,
+    MOTION_GATING_ENABLED,
+    TRACKING_ENABLED,
+    ALERT_LOG_ENABLED,
+    CLIP_RECORDING_ENABLED,
+    FRAME_EVENT_BACKLOG
 )
 
+# Steps timed on every frame, exposed as histograms on /metrics
+TIMED_STEPS = ('capture', 'detect', 'extract', 'track', 'distances', 'overlay', 'encode', 'send')
+
 
 class CameraHandler:
-    """Handles camera input and frame generation"""
+    """Handles camera input and frame generation for one camera"""
     
-    def __init__(self):
-        """Initialize the camera handler"""
-        self.detection = DetectionProcessor()
-        self.model = get_model()
+    def __init__(self, camera_id, source, batcher):
+        """
+        Initialize the camera handler
+        
+        Args:
+            camera_id: Name of the camera used in routes
+            source: Camera index, video file or image directory
+            batcher: Shared InferenceBatcher running detection for all cameras
+        """
+        self.camera_id = camera_id
+        self.source = source
+        self.detection = DetectionProcessor(camera_id)
+        self.batcher = batcher
         self.cap = None
+        self.broadcaster = FrameBroadcaster()
+        self.pipeline = None
+        self.buffer_pool = None
+        self.pacer = FramePacer(TARGET_FPS)
+        self.motion_gate = MotionGate() if MOTION_GATING_ENABLED else None
+        self.tracker = ObjectTracker() if TRACKING_ENABLED else None
+        self.overlay = OverlayRenderer()
+        self.clip_recorder = ClipRecorder(camera_id, get_clip_writer()) if CLIP_RECORDING_ENABLED else None
+        self.last_detections = ([], [])
+        self.overlay_viewers = 0
+        self.raw_viewers = 0
+        self.timings = {step: Histogram() for step in TIMED_STEPS}
+        self.detection_modes = {'detect': 0, 'track': 0, 'reuse': 0}
+        self.camera_errors = 0
+        self.frame_sequence = 0
+        self.frame_events = AlertEventBus(FRAME_EVENT_BACKLOG)
+        self._lock = threading.Lock()
     
     def initialize_camera(self):
         """Initialize camera capture"""
-        self.cap = cv2.VideoCapture(CAMERA_INDEX)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
-        print("Camera started...")
+        self.cap = open_capture(self.source)
+        if is_live_source(self.source):
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+        print(f"Camera '{self.camera_id}' started...")
+    
+    def start(self):
+        """Start the shared frame pipeline if it is not already running"""
+        with self._lock:
+            if self.pipeline is not None and self.pipeline.is_alive():
+                return
+            if self.broadcaster.closed:
+                self.broadcaster = FrameBroadcaster()
+            self.pipeline = FramePipeline(
+                [
+                    ('capture', self._capture),
+                    ('inference', self._infer),
+                    ('annotate', self._annotate),
+                    ('encode', self._encode),
+                ],
+                queue_size=PIPELINE_QUEUE_SIZE,
+                on_stop=self.broadcaster.close,
+                on_drop=self._release_packet,
+                # Recordings are replayed in full; live cameras skip frames
+                drop_oldest=is_live_source(self.source)
+            )
+            self.pipeline.start()
+    
+    @contextmanager
+    def watching(self, raw=False):
+        """
+        Count a viewer for as long as it is streaming
+        
+        The annotate stage uses the counts to decide whether to draw the
+        overlay, keep a raw copy of the frame, or both.
+        
+        Args:
+            raw: Whether the viewer streams the frame without overlay
+        """
+        with self._lock:
+            if raw:
+                self.raw_viewers += 1
+            else:
+                self.overlay_viewers += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                if raw:
+                    self.raw_viewers -= 1
+                else:
+                    self.overlay_viewers -= 1
     
-    def generate_frames(self):
+    def generate_frames(self, variant=DEFAULT_VARIANT, max_fps=None):
         """
-        Generate video frames with object detection and distance calculation
+        Stream frames from the shared pipeline to one viewer
+        
+        Args:
+            variant: (quality, scale, raw) of the JPEG sent to this viewer
+            max_fps: Frame rate cap for this viewer, None for no cap
         
         Yields:
-            bytes: JPEG encoded frame with detection overlay
+            bytes: Multipart chunk holding a JPEG frame, with detection
+                overlay unless the variant asks for the raw image
+        """
+        self.start()
+        min_interval = 1.0 / max_fps if max_fps else 0.0
+        with self.watching(variant[2]):
+            for frame in self.broadcaster.subscribe():
+                sent_at = time.monotonic()
+                part = frame.get(variant)
+                if part is None:
+                    # Frame was replaced before this variant got encoded
+                    continue
+                send_started = time.perf_counter()
+                yield part
+                self.timings['send'].observe(time.perf_counter() - send_started)
+                
+                # Frames published while we sleep are skipped, not queued
+                remaining = min_interval - (time.monotonic() - sent_at)
+                if remaining > 0:
+                    time.sleep(remaining)
+    
+    def collect_metrics(self, families):
+        """
+        Add this camera's samples to the /metrics families
+        
+        Everything except the timing histograms is read here, at scrape
+        time, from counters the pipeline keeps anyway.
+        
+        Args:
+            families: Dict of MetricFamily by name, from collect_metrics()
+        """
+        labels = {'camera': self.camera_id}
+        for step, histogram in self.timings.items():
+            families['step_seconds'].add_histogram({**labels, 'step': step}, histogram)
+        
+        with self._lock:
+            viewers = {'overlay': self.overlay_viewers, 'raw': self.raw_viewers}
+        for kind, count in viewers.items():
+            families['viewers'].add({**labels, 'kind': kind}, count)
+        
+        for stage, stats in self.get_pipeline_stats().items():
+            stage_labels = {**labels, 'stage': stage}
+            families['frames_processed'].add(stage_labels, stats['processed'])
+            families['frame_errors'].add(stage_labels, stats['errors'])
+            if 'queue_depth' in stats:
+                families['queue_depth'].add(stage_labels, stats['queue_depth'])
+                families['frames_dropped'].add(stage_labels, stats['dropped'])
+        
+        for mode, count in self.detection_modes.items():
+            families['detection_frames'].add({**labels, 'mode': mode}, count)
+        
+        fps = self.get_fps_stats()
+        families['fps'].add({**labels, 'kind': 'target'}, fps['target'])
+        families['fps'].add({**labels, 'kind': 'achieved'}, fps['achieved'])
+        families['camera_errors'].add(labels, self.camera_errors)
+        
+        detection = self.detection
+        families['alert_episodes'].add(labels, detection.next_episode_id - 1)
+        families['alerts_active'].add(labels, len(detection.active_episodes))
+        families['critical_now'].add(labels, len(detection.current_critical_alerts))
+        
+        if self.buffer_pool is not None:
+            families['buffer_allocations'].add(labels, self.buffer_pool.allocations)
+    
+    def get_pipeline_stats(self):
+        """Get per-stage throughput counters"""
+        if self.pipeline is None:
+            return {}
+        return self.pipeline.get_stats()
+    
+    def get_fps_stats(self):
+        """Get target, paced and achieved frame rates"""
+        stats = self.get_pipeline_stats()
+        return {
+            'target': self.pacer.target_fps,
+            'paced': round(self.pacer.paced_fps, 2),
+            'capture': round(self.pacer.capture_fps, 2),
+            'achieved': stats.get('encode', {}).get('fps', 0.0)
+        }
+    
+    def _capture(self):
+        """
+        Pipeline stage: read the next frame from the camera
+        
+        Returns:
+            dict: Frame packet, or None when the camera stops
         """
         if self.cap is None:
             self.initialize_camera()
         
-        while True:
+        # Wait out the rest of the frame interval
+        self.pacer.wait()
+        
+        started = time.perf_counter()
+        if self.buffer_pool is None:
             success, frame = self.cap.read()
-            if not success:
-                print("Camera error!")
-                break
-            
+            if success:
+                self.buffer_pool = FrameBufferPool(frame.shape, FRAME_POOL_SIZE)
+        else:
+            # Read straight into a pooled buffer instead of a new array
+            buffer = self.buffer_pool.acquire()
+            success, frame = self.cap.read(buffer)
+            if frame is not buffer:
+                self.buffer_pool.release(buffer)
+        
+        if not success:
+            if is_live_source(self.source):
+                print(f"Camera '{self.camera_id}' error!")
+                self.camera_errors += 1
+            else:
+                print(f"Camera '{self.camera_id}' reached the end of {self.source}")
+            self.cleanup()
+            return None
+        
+        self.timings['capture'].observe(time.perf_counter() - started)
+        self.frame_sequence += 1
+        return {'frame': frame, 'seq': self.frame_sequence, 'captured_at': time.time()}
+    
+    def _infer(self, packet):
+        """Pipeline stage: run object detection and distance checks"""
+        started = time.perf_counter()
+        frame = packet['frame']
+        
+        # Only the crib region matters for detection and motion
+        crop, offset = crop_roi(frame, CRIB_ROI)
+        roi = None
+        if CRIB_ROI is not None:
+            roi = (*offset, offset[0] + crop.shape[1], offset[1] + crop.shape[0])
+        
+        if self.motion_gate is not None and not self.motion_gate.should_detect(crop):
+            # Scene unchanged, reuse the previous detections
+            baby_boxes, hazard_boxes = self.last_detections
+            mode = 'reuse'
+        elif self.tracker is not None and not self.tracker.keyframe_due():
+            # Between keyframes, move the previous boxes along
+            baby_boxes, hazard_boxes = self.tracker.track(frame)
+            self.timings['track'].observe(time.perf_counter() - started)
+            mode = 'track'
+        else:
             # Run object detection
-            results = self.model.detect(frame)
-            
-            # Extract detections
-            baby_boxes, hazard_boxes = self.detection.extract_detections(results)
-            
-            # Start with basic annotated frame
-            annotated = results[0].plot()
+            results = self.batcher.detect(crop)
+            detected = time.perf_counter()
+            self.timings['detect'].observe(detected - started)
             
-            # Process distances and get alerts
-            distance_data, frame_has_critical = self.detection.process_distances(
-                baby_boxes, hazard_boxes
-            )
+            # Extract detections in full-frame coordinates
+            baby_boxes, hazard_boxes = self.detection.extract_detections(results, offset)
+            extracted = time.perf_counter()
+            self.timings['extract'].observe(extracted - detected)
             
-            # Draw distance lines and labels
-            for data in distance_data:
-                color = data['color']
-                baby_center = data['baby_center']
-                hazard_center = data['hazard_center']
-                distance = data['distance']
-                alert_level = data['alert_level']
-                hazard_box = data['hazard_box']
-                
-                # Draw line between baby and hazard
-                cv2.line(annotated, baby_center, hazard_center, color, 2)
-                
-                # Draw distance text
-                mid_point = (
-                    (baby_center[0] + hazard_center[0]) // 2,
-                    (baby_center[1] + hazard_center[1]) // 2
+            if self.tracker is not None:
+                baby_boxes, hazard_boxes = self.tracker.update_detections(
+                    frame, baby_boxes, hazard_boxes
                 )
-                cv2.putText(annotated, f"{distance:.1f}px", 
-                           (mid_point[0], mid_point[1] - 10),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                
-                # Draw alert level on hazard box
-                x1, y1, x2, y2 = map(int, hazard_box)
-                cv2.putText(annotated, f"{alert_level}", 
-                           (x1, y1 - 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            
-            # Add status overlay
-            status_text = f"Baby: {len(baby_boxes)} | Hazards: {len(hazard_boxes)} | Critical: {len(self.detection.current_critical_alerts)}"
-            cv2.putText(annotated, status_text, (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            # Add warning if critical alerts
-            if frame_has_critical:
-                warning_text = f"🚨 {len(self.detection.current_critical_alerts)} CRITICAL ALERT(S)!"
-                cv2.putText(annotated, warning_text, (10, 60),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-            
-            # Add timestamp
-            timestamp = time.strftime("%H:%M:%S")
-            cv2.putText(annotated, timestamp, (annotated.shape[1] - 120, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            # Encode frame to JPEG
-            ret, buffer = cv2.imencode('.jpg', annotated)
-            frame_bytes = buffer.tobytes()
-            
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            
-            # Small delay
-            time.sleep(FRAME_DELAY)
+                self.timings['track'].observe(time.perf_counter() - extracted)
+            mode = 'detect'
+            if self.motion_gate is not None:
+                self.motion_gate.mark_detected()
+        self.detection_modes[mode] += 1
+        self.last_detections = (baby_boxes, hazard_boxes)
+        
+        inferred = time.perf_counter()
+        self.pacer.report_inference(inferred - started)
+        
+        # Formatted once per frame, for the overlay and for every alert
+        time_str = time.strftime("%H:%M:%S", time.localtime(packet['captured_at']))
+        
+        # Process distances and get alerts
+        distance_data, frame_has_critical = self.detection.process_distances(
+            baby_boxes, hazard_boxes, packet['captured_at'], time_str, packet['seq']
+        )
+        self.timings['distances'].observe(time.perf_counter() - inferred)
+        
+        packet.update({
+            'roi': roi,
+            'baby_boxes': baby_boxes,
+            'hazard_boxes': hazard_boxes,
+            'distance_data': distance_data,
+            'frame_has_critical': frame_has_critical,
+            'critical_count': len(self.detection.current_critical_alerts),
+            'alert_ids': [alert['id'] for alert in self.detection.current_critical_alerts],
+            'mode': mode,
+            'inference_latency': inferred - started,
+            'time_str': time_str
+        })
+        return packet
+    
+    def _annotate(self, packet):
+        """Pipeline stage: draw detections, distances and status"""
+        # The buffer stays in the packet until drawn, so a failure releases it
+        frame = packet['frame']
+        
+        with self._lock:
+            overlay_viewers, raw_viewers = self.overlay_viewers, self.raw_viewers
+        
+        if raw_viewers and not overlay_viewers:
+            # Nobody needs the overlay, skip drawing entirely
+            packet['raw'] = packet.pop('frame')
+            return packet
+        
+        started = time.perf_counter()
+        if raw_viewers:
+            # Keep an undrawn copy before drawing in place
+            raw = self.buffer_pool.acquire()
+            np.copyto(raw, frame)
+            packet['raw'] = raw
+        
+        self.overlay.draw(
+            frame,
+            packet['baby_boxes'],
+            packet['hazard_boxes'],
+            packet['distance_data'],
+            packet['critical_count'],
+            packet['frame_has_critical'],
+            packet['time_str'],
+            roi=packet['roi']
+        )
+        self.timings['overlay'].observe(time.perf_counter() - started)
+        packet['annotated'] = packet.pop('frame')
+        return packet
+    
+    def _encode(self, packet):
+        """Pipeline stage: JPEG-encode the frame and publish it to viewers"""
+        # The frame owns the buffers from here on; left in the packet they
+        # would be released a second time if a later step failed
+        frame = EncodedFrame(
+            packet.pop('annotated', None),
+            raw_image=packet.pop('raw', None),
+            release=self._release_frame,
+            on_encode=self.timings['encode'].observe,
+            # Lets a client match a JPEG to its /frames/stream record
+            headers={
+                'X-Frame-Seq': packet['seq'],
+                'X-Capture-Time': f"{packet['captured_at']:.6f}"
+            }
+        )
+        
+        # Encode the default variant here; other variants are encoded on
+        # first request and then shared by every viewer using them
+        quality, scale, _ = DEFAULT_VARIANT
+        try:
+            part = frame.get((quality, scale, frame.image is None))
+        except Exception:
+            # Not published yet, so nobody else can be reading the buffers
+            frame.retire()
+            raise
+        previous = self.broadcaster.publish(frame)
+        
+        # The replaced frame's buffers can go back to the pool
+        if previous is not None:
+            previous.retire()
+        
+        if self.clip_recorder is not None and part is not None:
+            self.clip_recorder.add_frame(part, packet['captured_at'], packet['frame_has_critical'])
+        self.frame_events.publish('frame', self._frame_record(packet))
+        return None
+    
+    def _frame_record(self, packet):
+        """
+        Build the metadata record published alongside a frame
+        
+        Returns:
+            dict: seq, capture timestamp, inference and end-to-end latency
+                in milliseconds, how boxes were obtained, the detections and
+                the IDs of the critical alert episodes the frame belongs to
+        """
+        detections = [
+            {'class': 'baby', 'bbox': [round(c) for c in bbox]}
+            for bbox in packet['baby_boxes']
+        ]
+        for hazard in packet['hazard_boxes']:
+            detection = {
+                'class': hazard['name'],
+                'bbox': [round(c) for c in hazard['bbox']],
+                'confidence': round(hazard['confidence'], 3)
+            }
+            if 'track_id' in hazard:
+                detection['track_id'] = hazard['track_id']
+            detections.append(detection)
+        
+        return {
+            'seq': packet['seq'],
+            'timestamp': packet['captured_at'],
+            'inference_ms': round(packet['inference_latency'] * 1000, 2),
+            'latency_ms': round((time.time() - packet['captured_at']) * 1000, 2),
+            'mode': packet['mode'],
+            'detections': detections,
+            'critical': packet['frame_has_critical'],
+            'alert_ids': packet['alert_ids']
+        }
+    
+    def _release_frame(self, frame):
+        """Return a captured frame buffer to the pool"""
+        if self.buffer_pool is not None:
+            self.buffer_pool.release(frame)
+    
+    def _release_packet(self, packet):
+        """Release the buffers of a packet dropped by a full pipeline queue"""
+        for key in ('frame', 'annotated', 'raw'):
+            if key in packet:
+                self._release_frame(packet[key])
     
     def cleanup(self):
         """Clean up camera resources"""
         if self.cap:
             self.cap.release()
+            self.cap = None
 
 
-# Global camera handler instance
-camera_handler = None
+# Global camera handler instances, keyed by camera ID
+camera_handlers = {}
+_camera_handler_lock = threading.Lock()
+_batcher = None
 
 
-def get_camera_handler():
-    """Get or create the global camera handler instance"""
-    global camera_handler
-    if camera_handler is None:
-        camera_handler = CameraHandler()
-    return camera_handler
+def get_camera_ids():
+    """Get the configured camera IDs, default camera first"""
+    return list(CAMERA_SOURCES)
+
+
+def get_camera_handler(camera_id=None):
+    """
+    Get or create the camera handler for a camera
+    
+    Args:
+        camera_id: Configured camera ID, or None for the default camera
+    
+    Returns:
+        CameraHandler: Handler for the camera
+    
+    Raises:
+        KeyError: If the camera ID is not configured
+    """
+    global _batcher
+    if camera_id is None:
+        camera_id = get_camera_ids()[0]
+    source = CAMERA_SOURCES[camera_id]
+    with _camera_handler_lock:
+        if camera_id not in camera_handlers:
+            if _batcher is None:
+                _batcher = InferenceBatcher(len(CAMERA_SOURCES))
+            camera_handlers[camera_id] = CameraHandler(camera_id, source, _batcher)
+    return camera_handlers[camera_id]
+
+
+def collect_metrics():
+    """
+    Collect metrics for every started camera
+    
+    Returns:
+        list: MetricFamily objects for render_metrics
+    """
+    families = {
+        'step_seconds': MetricFamily(
+            'baby_monitor_step_seconds', 'histogram',
+            'Time spent per frame in each processing step'),
+        'frames_processed': MetricFamily(
+            'baby_monitor_frames_processed_total', 'counter',
+            'Frames handled by each pipeline stage'),
+        'frame_errors': MetricFamily(
+            'baby_monitor_frame_errors_total', 'counter',
+            'Frames a pipeline stage failed on and skipped'),
+        'frames_dropped': MetricFamily(
+            'baby_monitor_frames_dropped_total', 'counter',
+            'Frames discarded by the full queue in front of each stage'),
+        'queue_depth': MetricFamily(
+            'baby_monitor_queue_depth', 'gauge',
+            'Frames waiting in the queue in front of each stage'),
+        'detection_frames': MetricFamily(
+            'baby_monitor_detection_frames_total', 'counter',
+            'Frames by how boxes were obtained: model, tracker or reused (static scene)'),
+        'viewers': MetricFamily(
+            'baby_monitor_viewers', 'gauge',
+            'Connected /video_feed viewers'),
+        'fps': MetricFamily(
+            'baby_monitor_fps', 'gauge',
+            'Target and achieved output frame rate'),
+        'camera_errors': MetricFamily(
+            'baby_monitor_camera_errors_total', 'counter',
+            'Failed camera reads that stopped the pipeline'),
+        'alert_episodes': MetricFamily(
+            'baby_monitor_alert_episodes_total', 'counter',
+            'Critical alert episodes opened'),
+        'alerts_active': MetricFamily(
+            'baby_monitor_alert_episodes_active', 'gauge',
+            'Alert episodes not yet closed'),
+        'critical_now': MetricFamily(
+            'baby_monitor_critical_alerts', 'gauge',
+            'Critical alerts in the latest frame'),
+        'buffer_allocations': MetricFamily(
+            'baby_monitor_frame_buffer_allocations_total', 'counter',
+            'Frame buffers allocated by the pool'),
+    }
+    model_ready = MetricFamily(
+        'baby_monitor_model_ready', 'gauge',
+        'Whether the model is loaded and warmed up')
+    model_ready.add({}, is_model_ready())
+    extra = [model_ready]
+    if ALERT_LOG_ENABLED:
+        log = get_alert_log()
+        log_rows = MetricFamily(
+            'baby_monitor_alert_log_rows_total', 'counter',
+            'Episode updates written to, or dropped by, the alert log')
+        log_rows.add({'result': 'written'}, log.written)
+        log_rows.add({'result': 'dropped'}, log.dropped)
+        extra.append(log_rows)
+    if CLIP_RECORDING_ENABLED:
+        writer = get_clip_writer()
+        clip_frames = MetricFamily(
+            'baby_monitor_clip_frames_total', 'counter',
+            'Frames written to, or dropped by, the event clip writer')
+        clip_frames.add({'result': 'written'}, writer.frames_written)
+        clip_frames.add({'result': 'dropped'}, writer.frames_dropped)
+        clips = MetricFamily(
+            'baby_monitor_clips_total', 'counter',
+            'Event clips saved, or skipped because the clip writer was backed up')
+        clips.add({'result': 'written'}, writer.clips_written)
+        clips.add({'result': 'dropped'}, writer.clips_dropped)
+        extra.extend((clip_frames, clips))
+    
+    with _camera_handler_lock:
+        handlers = list(camera_handlers.values())
+    for handler in handlers:
+        handler.collect_metrics(families)
+    return [*extra, *families.values()]
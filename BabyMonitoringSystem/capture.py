@@ -0,0 +1,88 @@
+"""
+Capture sources: live cameras, recorded video files and image directories
+"""
+import os
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class ImageSequenceCapture:
+    """Reads a directory of images in name order, like cv2.VideoCapture"""
+
+    def __init__(self, directory):
+        """
+        Initialize the capture
+
+        Args:
+            directory: Directory holding the frames
+        """
+        self.paths = [
+            os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        self.position = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def set(self, prop_id, value):
+        """Capture properties cannot be changed on recorded frames"""
+        return False
+
+    def read(self, image=None):
+        """
+        Read the next image
+
+        Args:
+            image: Optional buffer to read into, used if the shape matches
+
+        Returns:
+            tuple: (success, frame)
+        """
+        while self.position < len(self.paths):
+            frame = cv2.imread(self.paths[self.position])
+            self.position += 1
+            if frame is None:
+                continue
+            if image is not None and image.shape == frame.shape:
+                np.copyto(image, frame)
+                return True, image
+            return True, frame
+        return False, None
+
+    def release(self):
+        self.position = len(self.paths)
+
+
+def is_live_source(source):
+    """Whether a capture source is a camera (index or stream URL) rather than a recording"""
+    if isinstance(source, int):
+        return True
+    return isinstance(source, str) and ('://' in source or source.isdigit())
+
+
+def open_capture(source):
+    """
+    Open a capture source
+
+    Args:
+        source: Camera index, stream URL (e.g. rtsp://...), path to a video
+            file, or path to a directory of images
+
+    Returns:
+        Object with the cv2.VideoCapture read/set/release/isOpened interface
+
+    Raises:
+        FileNotFoundError: If a path source does not exist
+    """
+    if is_live_source(source):
+        # Camera indexes from the environment or a config file are strings
+        return cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if os.path.isdir(source):
+        return ImageSequenceCapture(source)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Capture source not found: {source}")
+    return cv2.VideoCapture(source)
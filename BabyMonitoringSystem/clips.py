@@ -0,0 +1,296 @@
+"""
+Event clips: video saved around critical alert episodes
+"""
+import os
+import json
+import atexit
+import time
+import queue
+import threading
+from collections import deque
+import cv2
+import numpy as np
+from config import (
+    CLIP_DIR,
+    CLIP_PRE_ROLL,
+    CLIP_POST_ROLL,
+    CLIP_MAX_SECONDS,
+    CLIP_FPS,
+    CLIP_FOURCC,
+    CLIP_EXTENSION,
+    CLIP_QUEUE_SIZE,
+    CLIP_MAX_COUNT
+)
+
+# Writer closes a clip whose frames stopped arriving (e.g. the camera failed)
+CLIP_IDLE_TIMEOUT = CLIP_POST_ROLL + 5
+
+
+def _jpeg_from_part(part):
+    """JPEG bytes of a multipart chunk from encode_multipart"""
+    start = part.find(b'\r\n\r\n') + 4
+    return memoryview(part)[start:len(part) - 2]
+
+
+class ClipRecorder:
+    """
+    Pre-roll ring buffer of one camera's encoded frames
+
+    add_frame() runs on the encode stage and only moves references to
+    already encoded JPEGs around; decoding, video encoding and disk I/O are
+    left to the ClipWriter thread.
+    """
+
+    def __init__(self, camera_id, writer):
+        """
+        Initialize the recorder
+
+        Args:
+            camera_id: Camera the clips are named after
+            writer: ClipWriter that saves the clips
+        """
+        self.camera_id = camera_id
+        self.writer = writer
+        self.pre_roll = deque()
+        self.clip = None
+
+    def add_frame(self, part, timestamp, critical):
+        """
+        Buffer a frame, starting or extending a clip on critical frames
+
+        Args:
+            part: Multipart chunk holding the frame's JPEG
+            timestamp: Unix time the frame was captured
+            critical: Whether the frame has a critical alert
+        """
+        clip = self.clip
+        if clip is not None and timestamp >= clip['deadline']:
+            self.writer.submit(('end', clip['name']))
+            self.clip = clip = None
+
+        if critical:
+            if clip is None:
+                clip = self._start_clip(timestamp)
+            if clip is not None:
+                clip['deadline'] = min(timestamp + CLIP_POST_ROLL, clip['end_by'])
+
+        if clip is not None:
+            self.writer.submit(('frame', clip['name'], timestamp, part))
+            return
+
+        self.pre_roll.append((timestamp, part))
+        while self.pre_roll[0][0] < timestamp - CLIP_PRE_ROLL:
+            self.pre_roll.popleft()
+
+    def _start_clip(self, timestamp):
+        """Start a clip with the pre-roll; None if the writer had no room for it"""
+        name = f"{self.camera_id}_{time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))}"
+        if not self.writer.submit(('start', name, self.camera_id, timestamp)):
+            # Keep the pre-roll, the next critical frame tries again
+            return None
+        self.clip = {'name': name, 'end_by': timestamp + CLIP_MAX_SECONDS}
+        for buffered in self.pre_roll:
+            self.writer.submit(('frame', name, *buffered))
+        self.pre_roll.clear()
+        return self.clip
+
+
+class ClipWriter:
+    """
+    Background thread encoding clips to video files
+
+    Frames arrive as JPEGs on a bounded queue; when the writer cannot keep
+    up, messages are dropped rather than slowing the pipeline down: a
+    dropped frame leaves a gap, a dropped start skips the clip and a clip
+    whose end was dropped is closed after CLIP_IDLE_TIMEOUT. Frames are
+    written at a constant CLIP_FPS, repeating a frame to fill gaps, so clips
+    play back in real time. Clips go to a hidden file first and appear in
+    CLIP_DIR, with a .json sidecar, once they are complete.
+    """
+
+    def __init__(self, directory=CLIP_DIR):
+        """
+        Initialize the writer and start its thread
+
+        Args:
+            directory: Where clips are saved
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.clips_written = 0
+        self.clips_dropped = 0
+        self._queue = queue.Queue(maxsize=CLIP_QUEUE_SIZE)
+        self._clips = {}
+        self._thread = threading.Thread(target=self._run, name='clip-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """
+        Queue a ('start' | 'frame' | 'end', name, ...) message without blocking
+
+        Returns:
+            bool: False if the queue was full and the message was dropped
+        """
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if item[0] == 'frame':
+                self.frames_dropped += 1
+            elif item[0] == 'start':
+                self.clips_dropped += 1
+            return False
+
+    def close(self):
+        """Finish the clips being recorded and stop the writer"""
+        self._queue.put(('stop',))
+        self._thread.join()
+
+    def _run(self):
+        """Writer loop"""
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+            if item is not None and item[0] == 'stop':
+                for name in list(self._clips):
+                    self._on_end(name)
+                return
+            try:
+                if item is not None:
+                    getattr(self, f"_on_{item[0]}")(*item[1:])
+                self._close_idle()
+            except Exception as e:
+                print(f"Error writing clip: {e}")
+
+    def _on_start(self, name, camera_id, trigger_time):
+        self._clips[name] = {
+            'name': name,
+            'camera_id': camera_id,
+            'trigger_time': trigger_time,
+            'start_time': None,  # first frame, pre-roll included
+            'end_time': None,
+            'frames': 0,
+            'video': None,
+            'last_image': None,
+            'updated': time.monotonic()
+        }
+
+    def _on_frame(self, name, timestamp, part):
+        clip = self._clips.get(name)
+        if clip is None:
+            return
+        image = cv2.imdecode(np.frombuffer(_jpeg_from_part(part), dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return
+        if clip['video'] is None:
+            clip['start_time'] = timestamp
+            clip['size'] = (image.shape[1], image.shape[0])
+            clip['video'] = cv2.VideoWriter(
+                self._temp_path(name), cv2.VideoWriter_fourcc(*CLIP_FOURCC),
+                CLIP_FPS, clip['size']
+            )
+        elif (image.shape[1], image.shape[0]) != clip['size']:
+            image = cv2.resize(image, clip['size'])
+
+        # Repeat the previous frame over any gap, then add this one
+        due = int((timestamp - clip['start_time']) * CLIP_FPS)
+        while clip['last_image'] is not None and clip['frames'] < due:
+            clip['video'].write(clip['last_image'])
+            clip['frames'] += 1
+        if clip['frames'] <= due:
+            clip['video'].write(image)
+            clip['frames'] += 1
+            self.frames_written += 1
+        clip['last_image'] = image
+        clip['end_time'] = timestamp
+        clip['updated'] = time.monotonic()
+
+    def _on_end(self, name):
+        clip = self._clips.pop(name, None)
+        if clip is None or clip['video'] is None:
+            return
+        clip['video'].release()
+        os.replace(self._temp_path(name), os.path.join(self.directory, name + CLIP_EXTENSION))
+        with open(os.path.join(self.directory, name + '.json'), 'w') as f:
+            json.dump({
+                'name': name + CLIP_EXTENSION,
+                'camera_id': clip['camera_id'],
+                'trigger_time': clip['trigger_time'],
+                'start_time': clip['start_time'],
+                'end_time': clip['end_time'],
+                'duration': clip['frames'] / CLIP_FPS,
+                'width': clip['size'][0],
+                'height': clip['size'][1]
+            }, f)
+        self.clips_written += 1
+        self._prune()
+
+    def _close_idle(self):
+        """Finish clips that stopped receiving frames"""
+        now = time.monotonic()
+        for name, clip in list(self._clips.items()):
+            if now - clip['updated'] > CLIP_IDLE_TIMEOUT:
+                self._on_end(name)
+
+    def _temp_path(self, name):
+        return os.path.join(self.directory, f".{name}{CLIP_EXTENSION}")
+
+    def _prune(self):
+        """Delete the oldest clips beyond CLIP_MAX_COUNT"""
+        clips = list_clips(self.directory)
+        for clip in clips[CLIP_MAX_COUNT:]:
+            base = os.path.splitext(clip['name'])[0]
+            for filename in (clip['name'], base + '.json'):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+
+def list_clips(directory=CLIP_DIR, camera_id=None):
+    """
+    List saved clips, newest first
+
+    Args:
+        directory: Where clips are saved
+        camera_id: Only clips from this camera
+
+    Returns:
+        list: Clip metadata dicts with name, camera_id, start_time,
+            end_time, duration, width, height and size in bytes
+    """
+    clips = []
+    if not os.path.isdir(directory):
+        return clips
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json') or filename.startswith('.'):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                clip = json.load(f)
+            clip['size'] = os.path.getsize(os.path.join(directory, clip['name']))
+        except (OSError, ValueError, KeyError):
+            continue
+        if camera_id is None or clip['camera_id'] == camera_id:
+            clips.append(clip)
+    clips.sort(key=lambda clip: clip['start_time'], reverse=True)
+    return clips
+
+
+# Global clip writer instance
+clip_writer = None
+_clip_writer_lock = threading.Lock()
+
+
+def get_clip_writer():
+    """Get or create the global clip writer"""
+    global clip_writer
+    with _clip_writer_lock:
+        if clip_writer is None:
+            clip_writer = ClipWriter()
+            atexit.register(clip_writer.close)
+        return clip_writer
@@ -5,24 +5,83 @@ Configuration settings for the Baby Safety Monitoring System
 # Model configuration
 MODEL_PATH = 'my_model4.pt'
 CONFIDENCE_THRESHOLD = 0.5
+MODEL_WARMUP_RUNS = 3  # blank-frame inferences run at startup before reporting ready
+MODEL_RETRY_AFTER = 2  # seconds clients are told to wait while the model warms up
+INFERENCE_BACKEND = 'torch'  # 'torch', 'onnx' or 'onnx-int8' (exported next to MODEL_PATH on first run)
+INFERENCE_THREADS = 0  # ONNX Runtime CPU threads, 0 = one per core
+INFERENCE_IMGSZ = 640  # longest side of the network input; lower (e.g. 320) is faster on CPU
+CRIB_ROI = None  # (x1, y1, x2, y2) in frame pixels to run detection on, None = whole frame
 
 # Distance thresholds (in pixels)
 CRITICAL_DISTANCE = 100
 WARNING_DISTANCE = 200
 
 # Alert settings
-ALERT_COOLDOWN = 5  # seconds between alert sounds
+ALERT_COOLDOWN = 5  # seconds a hazard must be clear before a new alert episode opens
+ALERT_REGION_SIZE = 80  # pixel grid used to group untracked hazards into episodes
 ALERT_HISTORY_LIMIT = 60  # seconds to keep alerts
+ALERT_HISTORY_MAX_ENTRIES = 2000  # hard cap on stored alerts (ring buffer size)
 RECENT_ALERTS_LIMIT = 10  # number of recent alerts to return
+ALERT_EVENT_BACKLOG = 200  # alert stream events kept for clients resuming by Last-Event-ID
+ALERT_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments on /alerts/stream
+FRAME_EVENT_BACKLOG = 100  # frame records kept for /frames/stream clients resuming by Last-Event-ID
+ALERT_LOG_ENABLED = True  # persist alert episodes to SQLite for /alerts/history
+ALERT_LOG_PATH = 'alerts.db'
+ALERT_LOG_QUEUE_SIZE = 10000  # episode updates waiting for the writer; more are dropped
+ALERT_LOG_BATCH_SIZE = 500  # rows committed per transaction
+ALERT_LOG_FLUSH_INTERVAL = 1.0  # seconds the writer waits to fill a batch
+ALERT_LOG_PAGE_LIMIT = 100  # default /alerts/history page size
+ALERT_LOG_MAX_PAGE_LIMIT = 1000
+
+# Event clips (video around critical episodes, listed on /clips)
+CLIP_RECORDING_ENABLED = True
+CLIP_DIR = 'clips'
+CLIP_PRE_ROLL = 5  # seconds of video kept from before the episode
+CLIP_POST_ROLL = 5  # seconds recorded after the last critical frame
+CLIP_MAX_SECONDS = 60  # longest clip; a longer episode continues in a new clip
+CLIP_FPS = 10  # clip frame rate; frames are repeated or skipped to keep real time
+CLIP_FOURCC = 'VP80'  # VP8 WebM plays in browsers; 'mp4v' with '.mp4' is much cheaper on slow CPUs but rarely plays in browsers
+CLIP_EXTENSION = '.webm'
+CLIP_QUEUE_SIZE = 300  # frames waiting for the clip writer; more are dropped
+CLIP_MAX_COUNT = 200  # oldest clips are deleted beyond this
 
 # Camera settings
 CAMERA_INDEX = 0
+CAMERA_SOURCES = {  # camera_id -> camera index, stream URL, video file or image directory; the first one is the default feed
+    'nursery': CAMERA_INDEX,
+}
 FRAME_WIDTH = 640
 FRAME_HEIGHT = 480
-FRAME_DELAY = 0.1  # seconds
+TARGET_FPS = 10  # capture rate; lowered automatically when inference is slower, 0 = unpaced
+
+# Motion gating (skip inference while the scene is static)
+MOTION_GATING_ENABLED = True
+MOTION_DOWNSCALE_WIDTH = 160  # width of the grayscale frame used for comparison
+MOTION_PIXEL_THRESHOLD = 25  # per-pixel intensity change counted as motion
+MOTION_AREA_THRESHOLD = 0.01  # fraction of changed pixels that triggers detection
+MOTION_MAX_SKIP_SECONDS = 5.0  # force a full detection at least this often
+
+# Tracking between keyframe detections
+TRACKING_ENABLED = True
+TRACKING_KEYFRAME_INTERVAL = 3  # run full detection every N frames
+TRACKER_TYPE = 'velocity'  # 'velocity', or OpenCV tracker: 'mil', 'kcf', 'csrt'
+TRACKING_IOU_THRESHOLD = 0.3  # minimum overlap to keep a track ID across keyframes
+
+# Stream encoding (per-client variants via /video_feed?quality=&scale=&max_fps=)
+JPEG_QUALITY = 95  # default JPEG quality
+STREAM_MIN_QUALITY = 20
+STREAM_QUALITY_STEP = 5  # requested quality is snapped to this step
+STREAM_MIN_SCALE = 0.25
+STREAM_SCALE_STEP = 0.25  # requested scale is snapped to this step
+
+# Pipeline settings
+PIPELINE_QUEUE_SIZE = 2  # frames buffered between stages (oldest dropped when full)
+FRAME_POOL_SIZE = 12  # preallocated capture buffers reused across the pipeline
+BATCH_WAIT = 0.01  # seconds to wait for other cameras' frames before running a batch
 
 # Server settings
 SERVER_HOST = '0.0.0.0'
 SERVER_PORT = 5001
 DEBUG_MODE = False
 THREADED = True
+SERVER_MODE = 'threaded'  # 'threaded' (Flask dev server) or 'asgi' (uvicorn, needs uvicorn + asgiref)
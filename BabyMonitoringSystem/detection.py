@@ -2,137 +2,275 @@
 Detection logic and frame processing
 """
 import time
-import cv2
+import numpy as np
+from alerts import AlertHistory, AlertEventBus
+from alert_log import get_alert_log
 from models import get_model
 from config import (
     CONFIDENCE_THRESHOLD, 
     CRITICAL_DISTANCE, 
     WARNING_DISTANCE,
-    CAMERA_INDEX,
-    FRAME_WIDTH,
-    FRAME_HEIGHT,
-    FRAME_DELAY,
-    ALERT_COOLDOWN
+    ALERT_COOLDOWN,
+    ALERT_REGION_SIZE,
+    ALERT_HISTORY_LIMIT,
+    ALERT_HISTORY_MAX_ENTRIES,
+    RECENT_ALERTS_LIMIT,
+    ALERT_EVENT_BACKLOG,
+    ALERT_LOG_ENABLED
+)
+from utils import calculate_distance_matrix, get_current_timestamp_str
+
+# Alert levels as stored in the distance_data 'levels' array
+LEVEL_SAFE = 0
+LEVEL_WARNING = 1
+LEVEL_CRITICAL = 2
+ALERT_LEVELS = ('SAFE', 'WARNING', 'CRITICAL')
+ALERT_COLORS = (
+    (0, 255, 0),    # Green (SAFE)
+    (0, 165, 255),  # Orange (WARNING)
+    (0, 0, 255)     # Red (CRITICAL)
 )
-from utils import calculate_distance, get_current_timestamp_str
 
 
 class DetectionProcessor:
     """Handles object detection and frame processing"""
     
-    def __init__(self):
-        """Initialize the detection processor"""
-        self.model = get_model()
+    def __init__(self, camera_id=None):
+        """
+        Initialize the detection processor
+        
+        Args:
+            camera_id: Camera the episodes are logged under
+        """
+        self.camera_id = camera_id
         self.last_alert_time = 0
         self.current_critical_alerts = []
-        self.alerts_history = []
+        self.alerts_history = AlertHistory(ALERT_HISTORY_MAX_ENTRIES, ALERT_HISTORY_LIMIT)
+        self.active_episodes = {}
+        self.next_episode_id = 1
+        self.events = AlertEventBus(ALERT_EVENT_BACKLOG)
+        self.alert_log = get_alert_log() if ALERT_LOG_ENABLED else None
     
-    def extract_detections(self, results):
+    def extract_detections(self, results, offset=(0, 0)):
         """
         Extract baby and hazard detections from YOLO results
         
         Args:
             results: YOLO detection results
+            offset: (x, y) of the detected crop in the full frame, added to
+                every box so the boxes are in full-frame coordinates
         
         Returns:
             tuple: (baby_boxes, hazard_boxes)
         """
         baby_boxes = []
         hazard_boxes = []
+        model = get_model()
+        class_names = model.class_names
+        baby_class_mask = model.baby_class_mask
         
         for result in results:
-            for box in result.boxes:
-                class_id = int(box.cls[0])
-                confidence = float(box.conf[0])
-                bbox = box.xyxy[0].tolist()
-                class_name = self.model.get_class_name(class_id)
-                
-                if class_name == 'baby' and confidence > CONFIDENCE_THRESHOLD:
-                    baby_boxes.append(bbox)
-                elif class_name != 'baby' and confidence > CONFIDENCE_THRESHOLD:
-                    hazard_boxes.append({
-                        'bbox': bbox,
-                        'name': class_name,
-                        'confidence': confidence
-                    })
+            # Rows are [x1, y1, x2, y2, conf, cls]
+            data = result.boxes.data
+            if not isinstance(data, np.ndarray):
+                # Torch tensor: one device-to-host copy per result
+                data = data.cpu().numpy()
+            if len(data) == 0:
+                continue
+            
+            if offset != (0, 0):
+                data = data.copy()
+                data[:, [0, 2]] += offset[0]
+                data[:, [1, 3]] += offset[1]
+            
+            confidences = data[:, 4]
+            class_ids = data[:, 5].astype(np.intp)
+            keep = confidences > CONFIDENCE_THRESHOLD
+            is_baby = baby_class_mask[class_ids]
+            
+            baby_boxes.extend(data[keep & is_baby, :4].tolist())
+            
+            hazard_mask = keep & ~is_baby
+            for bbox, class_id, confidence in zip(data[hazard_mask, :4].tolist(),
+                                                  class_ids[hazard_mask].tolist(),
+                                                  confidences[hazard_mask].tolist()):
+                hazard_boxes.append({
+                    'bbox': bbox,
+                    'name': class_names[class_id],
+                    'confidence': confidence
+                })
         
         return baby_boxes, hazard_boxes
     
-    def process_distances(self, baby_boxes, hazard_boxes):
+    def process_distances(self, baby_boxes, hazard_boxes, timestamp=None, time_str=None,
+                          frame_seq=None):
         """
-        Calculate distances and generate alerts
+        Calculate distances and generate alerts for every baby/hazard pair
         
         Args:
             baby_boxes: List of baby bounding boxes
             hazard_boxes: List of hazard detections
+            timestamp: Capture time of the frame, defaults to now
+            time_str: timestamp formatted for display, formatted here if needed
+            frame_seq: Sequence number of the frame, recorded on its alerts
         
         Returns:
-            list: Distance data for drawing
+            tuple: (distance_data, frame_has_critical). distance_data holds
+                'distances' and 'levels' arrays of shape (babies, hazards)
+                plus integer 'baby_centers' and 'hazard_centers' for drawing.
+                Levels index into ALERT_LEVELS and ALERT_COLORS.
         """
-        current_time = time.time()
-        distance_data = []
+        current_time = timestamp if timestamp is not None else time.time()
+        
+        distances, baby_centers, hazard_centers = calculate_distance_matrix(
+            baby_boxes, [hazard['bbox'] for hazard in hazard_boxes]
+        )
+        
+        # Classify all pairs at once: 0 = SAFE, 1 = WARNING, 2 = CRITICAL
+        levels = np.zeros(distances.shape, dtype=np.int8)
+        levels[distances < WARNING_DISTANCE] = LEVEL_WARNING
+        critical_mask = distances < CRITICAL_DISTANCE
+        levels[critical_mask] = LEVEL_CRITICAL
         
         # Clear critical alerts
+        previous_critical = len(self.current_critical_alerts)
         self.current_critical_alerts.clear()
-        frame_has_critical = False
-        
-        for baby_box in baby_boxes:
-            for hazard in hazard_boxes:
-                hazard_box = hazard['bbox']
-                distance, baby_center, hazard_center = calculate_distance(baby_box, hazard_box)
-                
-                # Determine alert level based on distance
-                color = (0, 255, 0)  # Green (SAFE)
-                alert_level = "SAFE"
-                
-                if distance < CRITICAL_DISTANCE:  # CRITICAL
-                    color = (0, 0, 255)  # Red
-                    alert_level = "CRITICAL"
-                    frame_has_critical = True
-                    
-                    # Store critical alert
-                    alert_data = {
-                        'type': 'CRITICAL',
-                        'hazard': hazard['name'],
-                        'distance': float(distance),
-                        'timestamp': current_time,
-                        'message': f'CRITICAL: Baby near {hazard["name"]} ({distance:.1f}px)',
-                        'time_str': get_current_timestamp_str()
-                    }
-                    self.current_critical_alerts.append(alert_data)
-                    self.alerts_history.append(alert_data)
-                
-                elif distance < WARNING_DISTANCE:  # WARNING
-                    color = (0, 165, 255)  # Orange
-                    alert_level = "WARNING"
-                
-                # Store distance data for drawing
-                distance_data.append({
-                    'baby_center': baby_center,
-                    'hazard_center': hazard_center,
-                    'distance': distance,
-                    'color': color,
-                    'alert_level': alert_level,
-                    'hazard_box': hazard_box
-                })
+        frame_has_critical = bool(critical_mask.any())
+        
+        if frame_has_critical:
+            if time_str is None:
+                time_str = get_current_timestamp_str()
+            
+            # Closest baby per hazard, so each hazard updates its episode once
+            hazard_distances = np.where(critical_mask, distances, np.inf).min(axis=0)
+            for hazard_index in np.nonzero(np.isfinite(hazard_distances))[0]:
+                episode = self._record_critical(
+                    hazard_boxes[hazard_index],
+                    hazard_centers[hazard_index],
+                    float(hazard_distances[hazard_index]),
+                    current_time,
+                    time_str,
+                    frame_seq
+                )
+                if all(alert is not episode for alert in self.current_critical_alerts):
+                    self.current_critical_alerts.append(episode)
+        
+        self._expire_episodes(current_time)
+        
+        # Tell stream clients when the number of active critical hazards changes
+        if len(self.current_critical_alerts) != previous_critical:
+            self.events.publish('state', {
+                'critical_now': len(self.current_critical_alerts),
+                'timestamp': current_time
+            })
         
         # Update alert timing
         if frame_has_critical and current_time - self.last_alert_time > ALERT_COOLDOWN:
             self.last_alert_time = current_time
         
+        distance_data = {
+            'distances': distances,
+            'levels': levels,
+            'baby_centers': baby_centers.astype(np.int32),
+            'hazard_centers': hazard_centers.astype(np.int32)
+        }
         return distance_data, frame_has_critical
     
-    def get_recent_alerts(self, seconds=60, limit=10):
-        """Get alerts from the last N seconds"""
-        current_time = time.time()
-        recent = [a for a in self.alerts_history if current_time - a['timestamp'] < seconds]
-        return recent[-limit:]
+    def _episode_key(self, hazard, hazard_center):
+        """
+        Identify which episode a critical hazard belongs to
+        
+        Tracked hazards are keyed by their track ID; untracked hazards fall
+        back to the coarse region of the frame their center lies in.
+        """
+        if 'track_id' in hazard:
+            return (hazard['name'], 'track', hazard['track_id'])
+        cell_x, cell_y = (int(c) // ALERT_REGION_SIZE for c in hazard_center)
+        return (hazard['name'], 'region', cell_x, cell_y)
+    
+    def _record_critical(self, hazard, hazard_center, distance, current_time, time_str,
+                         frame_seq=None):
+        """
+        Fold a critical sighting into its episode, opening a new one if needed
+        
+        The episode keeps the sequence numbers of its first and latest frame,
+        so clients can find the frames an alert came from.
+        
+        Returns:
+            dict: The episode the sighting was recorded in
+        """
+        key = self._episode_key(hazard, hazard_center)
+        episode = self.active_episodes.get(key)
+        
+        if episode is None or current_time - episode['last_seen'] > ALERT_COOLDOWN:
+            episode = {
+                'id': self.next_episode_id,
+                'type': 'CRITICAL',
+                'hazard': hazard['name'],
+                'track_id': hazard.get('track_id'),
+                'timestamp': current_time,
+                'start_time': current_time,
+                'last_seen': current_time,
+                'distance': distance,
+                'min_distance': distance,
+                'frame_count': 0,
+                'message': f'CRITICAL: Baby near {hazard["name"]} ({distance:.1f}px)',
+                'time_str': time_str,
+                'frame_seq': frame_seq,
+                'last_frame_seq': frame_seq
+            }
+            self.next_episode_id += 1
+            self.active_episodes[key] = episode
+            self.alerts_history.append(episode)
+            self.events.publish('episode_open', dict(episode, frame_count=1))
+            if self.alert_log is not None:
+                self.alert_log.record(self.camera_id, dict(episode, frame_count=1))
+        
+        episode['last_seen'] = current_time
+        episode['last_frame_seq'] = frame_seq
+        episode['distance'] = distance
+        episode['frame_count'] += 1
+        if distance < episode['min_distance']:
+            episode['min_distance'] = distance
+            episode['message'] = f'CRITICAL: Baby near {hazard["name"]} ({distance:.1f}px)'
+        return episode
+    
+    def _expire_episodes(self, current_time):
+        """Close episodes that have not been seen for ALERT_COOLDOWN seconds"""
+        expired = [
+            key for key, episode in self.active_episodes.items()
+            if current_time - episode['last_seen'] > ALERT_COOLDOWN
+        ]
+        for key in expired:
+            episode = self.active_episodes.pop(key)
+            self.events.publish('episode_close', episode)
+            if self.alert_log is not None:
+                self.alert_log.record(self.camera_id, episode, closed=True)
+    
+    def get_recent_alerts(self, seconds=ALERT_HISTORY_LIMIT, limit=RECENT_ALERTS_LIMIT,
+                          now=None):
+        """
+        Get alert episodes from the last N seconds
+        
+        Episodes that started earlier but are still ongoing are included too,
+        so a long episode does not disappear while it is still happening.
+        """
+        alerts, _ = self.alerts_history.get_recent(seconds, limit, now=now)
+        listed = {alert['id'] for alert in alerts}
+        ongoing = [
+            episode for episode in list(self.active_episodes.values())
+            if episode['id'] not in listed
+        ]
+        ongoing.sort(key=lambda episode: episode['start_time'])
+        return (ongoing + alerts)[-limit:]
     
     def get_alerts_summary(self):
-        """Get alerts summary"""
+        """Get alert episodes summary"""
+        current_time = time.time()
+        alerts = self.get_recent_alerts(now=current_time)
         return {
-            'alerts': self.get_recent_alerts(),
-            'total': len(self.get_recent_alerts()),
+            'alerts': alerts,
+            'total': len(alerts),
             'critical_now': len(self.current_critical_alerts),
-            'timestamp': time.time()
+            'timestamp': current_time
         }
@@ -0,0 +1,165 @@
+"""
+JPEG encoding of annotated frames, shared between stream viewers
+"""
+import time
+import threading
+import cv2
+from config import (
+    JPEG_QUALITY,
+    STREAM_MIN_QUALITY,
+    STREAM_QUALITY_STEP,
+    STREAM_MIN_SCALE,
+    STREAM_SCALE_STEP
+)
+
+DEFAULT_VARIANT = (JPEG_QUALITY, 1.0, False)
+# Content-Length lets a client (e.g. the mobile proxy) take the part as soon
+# as its last byte arrives instead of waiting for the next boundary
+MULTIPART_HEADER = '--frame\r\nContent-Type: image/jpeg\r\nContent-Length: {length}\r\n{headers}\r\n'
+MULTIPART_FOOTER = b'\r\n'
+
+
+def format_part_headers(headers):
+    """Render extra part headers, e.g. {'X-Frame-Seq': 12}, for encode_multipart"""
+    return ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+
+
+def encode_multipart(image, quality=JPEG_QUALITY, scale=1.0, headers=''):
+    """
+    Encode an image as one part of a multipart MJPEG stream
+
+    Args:
+        image: BGR image
+        quality: JPEG quality (0-100)
+        scale: Resize factor applied before encoding
+        headers: Extra part headers from format_part_headers
+
+    Returns:
+        bytes: Multipart chunk holding the JPEG
+    """
+    if scale != 1.0:
+        height, width = image.shape[:2]
+        image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+    ret, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    
+    # Copy the encoder output straight into the final chunk: one copy instead
+    # of tobytes() followed by two concatenations
+    header = MULTIPART_HEADER.format(length=buffer.size, headers=headers).encode()
+    return b''.join((header, memoryview(buffer), MULTIPART_FOOTER))
+
+
+def parse_stream_options(quality=None, scale=None, max_fps=None, raw=None):
+    """
+    Normalize per-client stream parameters from a query string
+
+    Quality and scale are snapped to coarse steps so the number of distinct
+    variants encoded per frame stays small.
+
+    Args:
+        quality: JPEG quality as a string, None for the default
+        scale: Resize factor as a string, None for full size
+        max_fps: Frame rate cap as a string, None for no cap
+        raw: '1' or 'true' for the camera image without overlay
+
+    Returns:
+        tuple: ((quality, scale, raw), max_fps)
+    """
+    try:
+        quality = int(quality)
+        quality = round(quality / STREAM_QUALITY_STEP) * STREAM_QUALITY_STEP
+        quality = min(100, max(STREAM_MIN_QUALITY, quality))
+    except (TypeError, ValueError):
+        quality = JPEG_QUALITY
+
+    try:
+        scale = float(scale)
+        scale = round(round(scale / STREAM_SCALE_STEP) * STREAM_SCALE_STEP, 2)
+        scale = min(1.0, max(STREAM_MIN_SCALE, scale))
+    except (TypeError, ValueError):
+        scale = 1.0
+
+    try:
+        max_fps = float(max_fps)
+        if max_fps <= 0:
+            max_fps = None
+    except (TypeError, ValueError):
+        max_fps = None
+
+    raw = str(raw).lower() in ('1', 'true', 'yes')
+
+    return (quality, scale, raw), max_fps
+
+
+class EncodedFrame:
+    """A frame with and without overlay, plus JPEG variants encoded at most once"""
+
+    def __init__(self, image, raw_image=None, release=None, on_encode=None, headers=None):
+        """
+        Initialize the frame
+
+        Args:
+            image: Annotated BGR image, None if only raw viewers are watching
+            raw_image: BGR image without overlay, None if nobody asked for it
+            release: Called with each image once the frame is retired, e.g.
+                to return a pooled buffer
+            on_encode: Called with the seconds each variant took to encode
+            headers: Extra headers for every variant's multipart part
+        """
+        self.image = image
+        self.raw_image = raw_image
+        self._headers = format_part_headers(headers) if headers else ''
+        self._release = release
+        self._on_encode = on_encode
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def retire(self):
+        """
+        Drop the image once a newer frame has been published
+
+        Variants encoded so far stay available; new variants can no longer
+        be encoded from this frame.
+        """
+        with self._lock:
+            images = (self.image, self.raw_image)
+            self.image = self.raw_image = None
+        if self._release:
+            for image in images:
+                if image is not None:
+                    self._release(image)
+
+    def get_cached(self, variant=DEFAULT_VARIANT):
+        """Get an already encoded variant, or None"""
+        return self._variants.get(variant)
+
+    def get(self, variant=DEFAULT_VARIANT):
+        """
+        Get a multipart chunk for a (quality, scale, raw) variant
+
+        The first viewer asking for a variant encodes it; everyone else
+        watching at the same settings reuses the result.
+
+        Args:
+            variant: (quality, scale, raw) tuple from parse_stream_options
+
+        Returns:
+            bytes: Multipart chunk holding the JPEG, or None if the frame was
+                retired before this variant was encoded, or was rendered
+                before a viewer of this kind joined
+        """
+        part = self._variants.get(variant)
+        if part is None:
+            with self._lock:
+                part = self._variants.get(variant)
+                if part is None:
+                    quality, scale, raw = variant
+                    image = self.raw_image if raw else self.image
+                    if image is None:
+                        return None
+                    started = time.perf_counter()
+                    part = encode_multipart(image, quality, scale, self._headers)
+                    if self._on_encode:
+                        self._on_encode(time.perf_counter() - started)
+                    self._variants[variant] = part
+        return part
@@ -3,6 +3,7 @@ Baby Safety Monitoring System - Main Entry Point
 """
 import sys
 from app import create_app
+from config import SERVER_HOST, SERVER_PORT, DEBUG_MODE, THREADED, SERVER_MODE
 
 if __name__ == '__main__':
     app = create_app()
@@ -35,4 +36,10 @@ if __name__ == '__main__':
     print("Press Ctrl+C to stop the server")
     print("="*60 + "\n")
     
-    app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
+    if SERVER_MODE == 'asgi':
+        # Streaming routes run as asyncio tasks instead of one thread per viewer
+        import uvicorn
+        from asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(), host=SERVER_HOST, port=SERVER_PORT)
+    else:
+        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG_MODE, threaded=THREADED)
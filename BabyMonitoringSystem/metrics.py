@@ -0,0 +1,130 @@
+"""
+Lightweight metrics with Prometheus text exposition
+"""
+import threading
+from bisect import bisect_left
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers sub-millisecond drawing up to slow CPU inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations
+
+    observe() is the only call made on the frame loop: one bisect and three
+    increments under an uncontended lock. Cumulative counts are only built
+    when the metrics are scraped.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram
+
+        Args:
+            buckets: Sorted upper bounds in seconds, +Inf is implied
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one value"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """
+        Get a consistent copy of the histogram
+
+        Returns:
+            tuple: (list of (upper bound, cumulative count), sum, count)
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return cumulative, total, count
+
+
+class MetricFamily:
+    """One named metric and its samples, collected at scrape time"""
+
+    def __init__(self, name, metric_type, help_text):
+        """
+        Initialize the family
+
+        Args:
+            name: Metric name, e.g. 'baby_monitor_frames_dropped_total'
+            metric_type: 'counter', 'gauge' or 'histogram'
+            help_text: One-line description
+        """
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.samples = []
+
+    def add(self, labels, value):
+        """Add a counter or gauge sample"""
+        self.samples.append((self.name, labels, value))
+
+    def add_histogram(self, labels, histogram):
+        """Add the bucket, sum and count samples of a histogram"""
+        cumulative, total, count = histogram.snapshot()
+        for bound, bucket_count in cumulative:
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            self.samples.append((f"{self.name}_bucket", {**labels, 'le': le}, bucket_count))
+        self.samples.append((f"{self.name}_sum", labels, total))
+        self.samples.append((f"{self.name}_count", labels, count))
+
+
+def _escape(value):
+    """Escape a label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    """Format a label dict as {name="value",...}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    """Format a sample value, keeping integers exact"""
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def render_metrics(families):
+    """
+    Render metric families in the Prometheus text format
+
+    Args:
+        families: Iterable of MetricFamily
+
+    Returns:
+        str: Exposition text
+    """
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help_text}")
+        lines.append(f"# TYPE {family.name} {family.metric_type}")
+        for name, labels, value in family.samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
@@ -1,19 +1,44 @@
 """
 YOLO model initialization and management
 """
-from ultralytics import YOLO
-from config import MODEL_PATH
+import time
+import threading
+import numpy as np
+from backends import load_backend
+from config import (
+    MODEL_PATH,
+    INFERENCE_BACKEND,
+    MODEL_WARMUP_RUNS,
+    FRAME_WIDTH,
+    FRAME_HEIGHT,
+    CAMERA_SOURCES,
+    CRIB_ROI
+)
+from utils import clip_roi
 
 
 class SafetyDetectionModel:
     """Wrapper class for YOLO model"""
     
-    def __init__(self):
-        """Initialize the YOLO model"""
-        print("Loading AI model...")
-        self.model = YOLO(MODEL_PATH)
+    def __init__(self, backend=INFERENCE_BACKEND, model_path=MODEL_PATH):
+        """
+        Initialize the YOLO model
+        
+        Args:
+            backend: Inference backend from backends.BACKENDS
+            model_path: Path to the PyTorch weights
+        """
+        print(f"Loading AI model ({backend} backend)...")
+        self.backend = backend
+        self.model, class_names = load_backend(backend, model_path)
+        self._load_class_names(class_names)
         print("Model loaded successfully!")
     
+    def _load_class_names(self, class_names):
+        """Resolve class names and the baby class mask once per model load"""
+        self.class_names = list(class_names)
+        self.baby_class_mask = np.array([name == 'baby' for name in self.class_names])
+    
     def detect(self, frame):
         """
         Run detection on a frame
@@ -22,22 +47,110 @@ class SafetyDetectionModel:
             frame: Input image frame
         
         Returns:
-            Detection results from YOLO
+            Detection results, one per frame, each with boxes.data rows
+            [x1, y1, x2, y2, conf, cls]
         """
         return self.model(frame)
     
+    def detect_batch(self, frames):
+        """
+        Run detection on several frames in one forward pass
+        
+        Args:
+            frames: List of input image frames
+        
+        Returns:
+            list: One YOLO result per frame, in the same order
+        """
+        return self.model(frames)
+    
+    def warm_up(self, runs=MODEL_WARMUP_RUNS, batch_size=1):
+        """
+        Run a few inferences on a blank frame the size of the detection input
+        
+        The first calls pay for lazy initialization and kernel selection;
+        doing them here keeps that cost away from the first viewer.
+        
+        Args:
+            runs: Number of warm-up passes
+            batch_size: Also warm up batches of this size if larger than one
+        """
+        x1, y1, x2, y2 = clip_roi(CRIB_ROI, FRAME_WIDTH, FRAME_HEIGHT)
+        frame = np.zeros((y2 - y1, x2 - x1, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.detect(frame)
+            if batch_size > 1:
+                self.detect_batch([frame] * batch_size)
+    
     def get_class_name(self, class_id):
         """Get class name by ID"""
-        return self.model.names[class_id]
+        return self.class_names[class_id]
 
 
-# Global model instance
+# Global model instance, set once it is loaded and warmed up
 model = None
+model_state = 'idle'
+model_error = None
+_model_ready = threading.Event()
+_model_lock = threading.Lock()
+
+
+def _load_model():
+    """Load and warm up the global model (runs on a background thread)"""
+    global model, model_state, model_error
+    try:
+        started = time.perf_counter()
+        loaded = SafetyDetectionModel()
+        model_state = 'warming_up'
+        loaded.warm_up(batch_size=len(CAMERA_SOURCES))
+        print(f"Model warmed up in {time.perf_counter() - started:.1f}s")
+        model = loaded
+        model_state = 'ready'
+    except Exception as e:
+        print(f"Model loading failed: {e}")
+        model_error = str(e)
+        model_state = 'error'
+    finally:
+        _model_ready.set()
+
+
+def start_model_loading():
+    """Start loading the global model in the background, if not already started"""
+    global model_state
+    with _model_lock:
+        if model_state != 'idle':
+            return
+        model_state = 'loading'
+    threading.Thread(target=_load_model, name="model-loader", daemon=True).start()
+
+
+def is_model_ready():
+    """Whether the model is loaded and warmed up"""
+    return model is not None
+
+
+def get_model_status():
+    """Get the model loading state for readiness checks"""
+    return {
+        'ready': is_model_ready(),
+        'state': model_state,
+        'error': model_error
+    }
 
 
 def get_model():
-    """Get or create the global model instance"""
-    global model
+    """
+    Get the global model instance, waiting for it to load if needed
+    
+    Returns:
+        SafetyDetectionModel: Loaded and warmed up model
+    
+    Raises:
+        RuntimeError: If the model failed to load
+    """
     if model is None:
-        model = SafetyDetectionModel()
+        start_model_loading()
+        _model_ready.wait()
+        if model is None:
+            raise RuntimeError(f"Model failed to load: {model_error}")
     return model
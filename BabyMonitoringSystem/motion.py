@@ -0,0 +1,81 @@
+"""
+Cheap scene-change detection used to skip inference on static frames
+"""
+import time
+import cv2
+from config import (
+    MOTION_DOWNSCALE_WIDTH,
+    MOTION_PIXEL_THRESHOLD,
+    MOTION_AREA_THRESHOLD,
+    MOTION_MAX_SKIP_SECONDS
+)
+
+
+class MotionGate:
+    """Decides whether a frame changed enough to need a fresh detection"""
+
+    def __init__(self):
+        """Initialize the gate with no reference frame"""
+        self.reference = None
+        self.candidate = None  # preprocessed frame of the last changed check
+        self.last_detection_time = 0
+        self.frames_detected = 0
+        self.frames_skipped = 0
+
+    def _preprocess(self, frame):
+        """Downscale and grayscale a frame for comparison"""
+        height, width = frame.shape[:2]
+        small_height = max(1, height * MOTION_DOWNSCALE_WIDTH // width)
+        small = cv2.resize(frame, (MOTION_DOWNSCALE_WIDTH, small_height),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_detect(self, frame):
+        """
+        Check whether the frame needs a full detection
+
+        The frame is compared against the one from the last detection, so slow
+        changes accumulate until they cross the threshold. A detection is also
+        forced once MOTION_MAX_SKIP_SECONDS have passed. The reference only
+        moves when mark_detected() reports that detection actually ran.
+
+        Args:
+            frame: BGR frame from the camera
+
+        Returns:
+            bool: True if detection should run on this frame
+        """
+        current_time = time.time()
+        gray = self._preprocess(frame)
+
+        if self.reference is None or self.reference.shape != gray.shape:
+            changed = True
+        elif current_time - self.last_detection_time >= MOTION_MAX_SKIP_SECONDS:
+            changed = True
+        else:
+            diff = cv2.absdiff(gray, self.reference)
+            _, mask = cv2.threshold(diff, MOTION_PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY)
+            changed = cv2.countNonZero(mask) > MOTION_AREA_THRESHOLD * mask.size
+
+        if changed:
+            self.candidate = gray
+        else:
+            self.frames_skipped += 1
+        return changed
+
+    def mark_detected(self):
+        """Make the frame of the last changed check the new reference"""
+        if self.candidate is None:
+            return
+        self.reference = self.candidate
+        self.candidate = None
+        self.last_detection_time = time.time()
+        self.frames_detected += 1
+
+    def get_stats(self):
+        """Get how many frames were detected versus skipped"""
+        return {
+            'detected': self.frames_detected,
+            'skipped': self.frames_skipped
+        }
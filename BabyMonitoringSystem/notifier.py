@@ -0,0 +1,55 @@
+"""
+Wake-ups from producer threads to asyncio consumers
+"""
+import asyncio
+import threading
+
+
+class AsyncNotifier:
+    """Lets asyncio tasks wait for state changes made by ordinary threads"""
+
+    def __init__(self):
+        """Initialize with no waiting tasks"""
+        self._waiters = set()
+        self._lock = threading.Lock()
+
+    def notify_all(self):
+        """Wake every waiting task; safe to call from any thread"""
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    async def wait_for(self, predicate, timeout=None):
+        """
+        Wait until predicate() is true
+
+        Args:
+            predicate: Callable checked after each notification
+            timeout: Maximum seconds to wait, or None to wait forever
+
+        Returns:
+            bool: Result of the last predicate check
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        deadline = None if timeout is None else loop.time() + timeout
+
+        # Register before checking, so a notification in between is not lost
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            while not predicate():
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return predicate()
+                event.clear()
+            return True
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
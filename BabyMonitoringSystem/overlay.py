@@ -0,0 +1,160 @@
+"""
+Lightweight overlay renderer for detection boxes, distances and status
+"""
+import cv2
+import numpy as np
+from detection import ALERT_LEVELS, ALERT_COLORS
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+BABY_COLOR = (255, 128, 0)
+HAZARD_COLOR = (0, 165, 255)
+STATUS_COLOR = (0, 255, 0)
+WARNING_COLOR = (0, 0, 255)
+TIMESTAMP_COLOR = (255, 255, 255)
+ROI_COLOR = (160, 160, 160)
+
+
+class OverlayRenderer:
+    """
+    Draws only what the stream needs, directly onto the frame
+
+    Labels that repeat every frame (class names, alert levels, warnings) are
+    rasterized once into a glyph mask and then stamped onto later frames,
+    which is much cheaper than rasterizing the text again with putText.
+    """
+
+    def __init__(self, cache_size=256):
+        """
+        Initialize the renderer
+
+        Args:
+            cache_size: Maximum number of cached label glyphs, 0 to disable
+        """
+        self.cache_size = cache_size
+        self._glyphs = {}
+
+    def _get_glyph(self, text, scale, color, thickness):
+        """Get or rasterize the colored bitmap and mask for a label"""
+        key = (text, scale, color, thickness)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            (width, height), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+            pad = thickness
+            mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), np.uint8)
+            cv2.putText(mask, text, (pad, height + pad), FONT, scale, 255, thickness)
+            bitmap = np.empty((*mask.shape, 3), np.uint8)
+            bitmap[:] = color
+            glyph = (bitmap, mask, height + pad, pad, width)
+            if self.cache_size:
+                if len(self._glyphs) >= self.cache_size:
+                    self._glyphs.pop(next(iter(self._glyphs)))
+                self._glyphs[key] = glyph
+        return glyph
+
+    def draw_label(self, image, text, origin, scale, color, thickness=2):
+        """
+        Stamp a cached label at a putText-style origin (left end of baseline)
+
+        Returns:
+            int: Width of the label in pixels
+        """
+        bitmap, mask, top, left, width = self._get_glyph(text, scale, color, thickness)
+        x0 = origin[0] - left
+        y0 = origin[1] - top
+        mask_h, mask_w = mask.shape
+        img_h, img_w = image.shape[:2]
+
+        if x0 >= 0 and y0 >= 0 and x0 + mask_w <= img_w and y0 + mask_h <= img_h:
+            # Masked copy straight into the frame region, no temporaries
+            cv2.copyTo(bitmap, mask, image[y0:y0 + mask_h, x0:x0 + mask_w])
+            return width
+
+        # Clip the glyph to the image
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x0 + mask_w, img_w), min(y0 + mask_h, img_h)
+        if cx0 < cx1 and cy0 < cy1:
+            glyph_rows = slice(cy0 - y0, cy1 - y0)
+            glyph_cols = slice(cx0 - x0, cx1 - x0)
+            cv2.copyTo(bitmap[glyph_rows, glyph_cols], mask[glyph_rows, glyph_cols],
+                       image[cy0:cy1, cx0:cx1])
+        return width
+
+    def draw(self, image, baby_boxes, hazard_boxes, distance_data,
+             critical_count, frame_has_critical, timestamp, roi=None):
+        """
+        Draw the full overlay in place
+
+        Args:
+            image: BGR frame to draw on
+            baby_boxes: List of baby bounding boxes
+            hazard_boxes: List of hazard detections
+            distance_data: Arrays returned by DetectionProcessor.process_distances
+            critical_count: Number of active critical alerts
+            frame_has_critical: Whether this frame has a critical pair
+            timestamp: Time string shown in the corner
+            roi: (x1, y1, x2, y2) region detection runs on, outlined if set
+        """
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            cv2.rectangle(image, (x1, y1), (x2 - 1, y2 - 1), ROI_COLOR, 1)
+
+        # Detection boxes
+        for bbox in baby_boxes:
+            x1, y1, x2, y2 = map(int, bbox)
+            cv2.rectangle(image, (x1, y1), (x2, y2), BABY_COLOR, 2)
+            self.draw_label(image, "baby", (x1, y1 - 8), 0.6, BABY_COLOR)
+
+        for hazard in hazard_boxes:
+            x1, y1, x2, y2 = map(int, hazard['bbox'])
+            cv2.rectangle(image, (x1, y1), (x2, y2), HAZARD_COLOR, 2)
+            label = hazard['name']
+            if 'track_id' in hazard:
+                label = f"#{hazard['track_id']} {label}"
+            width = self.draw_label(image, label, (x1, y1 - 8), 0.6, HAZARD_COLOR)
+            cv2.putText(image, f" {hazard['confidence']:.2f}", (x1 + width, y1 - 8),
+                        FONT, 0.6, HAZARD_COLOR, 2)
+
+        # Distance lines and labels
+        distances = distance_data['distances']
+        levels = distance_data['levels']
+        baby_centers = distance_data['baby_centers'].tolist()
+        hazard_centers = distance_data['hazard_centers'].tolist()
+
+        for baby_index, baby_center in enumerate(baby_centers):
+            baby_center = tuple(baby_center)
+            for hazard_index, hazard_center in enumerate(hazard_centers):
+                self._draw_distance(image, baby_center, tuple(hazard_center),
+                                    distances[baby_index, hazard_index],
+                                    levels[baby_index, hazard_index],
+                                    hazard_boxes[hazard_index]['bbox'])
+
+        # Status bar
+        status_text = (f"Baby: {len(baby_boxes)} | Hazards: {len(hazard_boxes)} "
+                       f"| Critical: {critical_count}")
+        self.draw_label(image, status_text, (10, 30), 0.7, STATUS_COLOR)
+
+        if frame_has_critical:
+            self.draw_label(image, f"{critical_count} CRITICAL ALERT(S)!", (10, 60),
+                            0.8, WARNING_COLOR)
+
+        cv2.putText(image, timestamp, (image.shape[1] - 120, 30),
+                    FONT, 0.6, TIMESTAMP_COLOR, 2)
+
+    def _draw_distance(self, image, baby_center, hazard_center, distance, level, hazard_bbox):
+        """Draw the line, distance and alert level for one baby-hazard pair"""
+        color = ALERT_COLORS[level]
+
+        # Line between baby and hazard
+        cv2.line(image, baby_center, hazard_center, color, 2)
+
+        # Distance text
+        mid_point = (
+            (baby_center[0] + hazard_center[0]) // 2,
+            (baby_center[1] + hazard_center[1]) // 2
+        )
+        cv2.putText(image, f"{distance:.1f}px", (mid_point[0], mid_point[1] - 10),
+                    FONT, 0.6, color, 2)
+
+        # Alert level on hazard box
+        x1, y1 = map(int, hazard_bbox[:2])
+        self.draw_label(image, ALERT_LEVELS[level], (x1, y1 - 30), 0.6, color)
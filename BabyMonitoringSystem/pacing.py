@@ -0,0 +1,66 @@
+"""
+Adaptive frame pacing for the capture loop
+"""
+import time
+from collections import deque
+
+
+class FramePacer:
+    """Paces frame capture to a target FPS, backing off when inference lags"""
+
+    def __init__(self, target_fps, smoothing=0.2):
+        """
+        Initialize the pacer
+
+        Args:
+            target_fps: Desired frames per second, 0 to run unpaced
+            smoothing: Weight of the newest sample in the inference-time average
+        """
+        self.target_fps = target_fps
+        self.target_interval = 1.0 / target_fps if target_fps > 0 else 0.0
+        self.interval = self.target_interval
+        self.smoothing = smoothing
+        self.inference_time = None
+        self._next_frame_at = None
+        self._ticks = deque(maxlen=30)
+
+    def wait(self):
+        """Sleep for whatever is left of the current frame interval"""
+        now = time.perf_counter()
+        if self._next_frame_at is not None and self._next_frame_at > now:
+            time.sleep(self._next_frame_at - now)
+            now = time.perf_counter()
+
+        # Never schedule in the past, so a slow frame does not cause a burst
+        base = now if self._next_frame_at is None else max(self._next_frame_at, now)
+        self._next_frame_at = base + self.interval
+        self._ticks.append(now)
+
+    def report_inference(self, seconds):
+        """
+        Record how long inference took for one frame
+
+        The frame interval is stretched to the smoothed inference time so
+        capture never runs ahead of what the model can keep up with.
+
+        Args:
+            seconds: Inference time of the latest frame
+        """
+        if self.inference_time is None:
+            self.inference_time = seconds
+        else:
+            self.inference_time += self.smoothing * (seconds - self.inference_time)
+        self.interval = max(self.target_interval, self.inference_time)
+
+    @property
+    def paced_fps(self):
+        """Frame rate the capture loop is currently being paced to"""
+        return 1.0 / self.interval if self.interval > 0 else 0.0
+
+    @property
+    def capture_fps(self):
+        """Measured capture rate over the last few frames"""
+        ticks = list(self._ticks)
+        if len(ticks) < 2 or ticks[-1] <= ticks[0]:
+            return 0.0
+        return (len(ticks) - 1) / (ticks[-1] - ticks[0])
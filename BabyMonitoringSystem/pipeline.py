@@ -0,0 +1,214 @@
+"""
+Multi-stage frame pipeline with bounded queues between worker threads
+"""
+import time
+import threading
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded FIFO queue that discards its oldest item when full"""
+
+    def __init__(self, maxsize, on_drop=None, block=False):
+        """
+        Initialize the queue
+
+        Args:
+            maxsize: Maximum number of items held at once
+            on_drop: Called with each item discarded to make room
+            block: Make put() wait for room instead of dropping, for sources
+                where every frame should be processed (recordings)
+        """
+        self._items = deque()
+        self._maxsize = maxsize
+        self._on_drop = on_drop
+        self._block = block
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Add an item, dropping the oldest one if the queue is full"""
+        dropped = None
+        with self._condition:
+            if self._block:
+                self._condition.wait_for(lambda: len(self._items) < self._maxsize)
+            if len(self._items) >= self._maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+        if dropped is not None and self._on_drop:
+            self._on_drop(dropped)
+
+    def get(self):
+        """
+        Remove and return the oldest item, waiting if the queue is empty
+
+        Returns:
+            The next item, or None once the queue is closed and drained
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._closed)
+            if self._items:
+                item = self._items.popleft()
+                # Wake a producer waiting for room
+                self._condition.notify_all()
+                return item
+            return None
+
+    def close(self):
+        """Close the queue and wake up any waiting consumer"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class PipelineStage:
+    """Worker thread that runs one step of the frame pipeline"""
+
+    def __init__(self, name, func, input_queue=None, output_queue=None, on_error=None):
+        """
+        Initialize the stage
+
+        Args:
+            name: Stage name used in thread names and statistics
+            func: Called with each input item (or with no arguments for the
+                first stage); returns the item to forward, or None to forward
+                nothing. The first stage ends the pipeline by returning None.
+            input_queue: Queue to read from, None for the source stage
+            output_queue: Queue to write to, None for the final stage
+            on_error: Called with an item whose processing raised, e.g. to
+                release its buffers
+        """
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.on_error = on_error
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._completions = deque(maxlen=30)
+        self._thread = None
+
+    def start(self, on_stop=None):
+        """Start the worker thread"""
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(on_stop,),
+            name=f"pipeline-{self.name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, on_stop):
+        """Process items until the input is exhausted"""
+        try:
+            while True:
+                if self.input_queue is None:
+                    item = None
+                else:
+                    item = self.input_queue.get()
+                    if item is None:
+                        break
+
+                started = time.perf_counter()
+                if self.input_queue is None:
+                    output = self.func()
+                else:
+                    # A bad frame must not take the stage down: the source
+                    # would keep running with nobody consuming its frames
+                    try:
+                        output = self.func(item)
+                    except Exception as e:
+                        self.errors += 1
+                        print(f"Pipeline stage '{self.name}' failed on a frame: {e}")
+                        if self.on_error:
+                            self.on_error(item)
+                        continue
+                finished = time.perf_counter()
+
+                if self.input_queue is None and output is None:
+                    break
+
+                self.processed += 1
+                self.busy_time += finished - started
+                self._completions.append(finished)
+
+                if output is not None and self.output_queue is not None:
+                    self.output_queue.put(output)
+        finally:
+            if self.output_queue is not None:
+                self.output_queue.close()
+            if on_stop:
+                on_stop()
+
+    def is_alive(self):
+        """Whether the worker thread is still running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self):
+        """Get throughput counters for this stage"""
+        completions = list(self._completions)
+        fps = 0.0
+        if len(completions) > 1 and completions[-1] > completions[0]:
+            fps = (len(completions) - 1) / (completions[-1] - completions[0])
+
+        stats = {
+            'processed': self.processed,
+            'errors': self.errors,
+            'fps': round(fps, 2),
+            'avg_ms': round(1000 * self.busy_time / self.processed, 2) if self.processed else 0.0
+        }
+        if self.input_queue is not None:
+            stats['queue_depth'] = len(self.input_queue)
+            stats['dropped'] = self.input_queue.dropped
+        return stats
+
+
+class FramePipeline:
+    """Chain of stages connected by drop-oldest queues"""
+
+    def __init__(self, steps, queue_size=2, on_stop=None, on_drop=None, drop_oldest=True):
+        """
+        Build the pipeline
+
+        Args:
+            steps: List of (name, func) pairs, the first one being the source
+            queue_size: Capacity of each queue between stages
+            on_stop: Called once the final stage has finished
+            on_drop: Called with each item a full queue discards
+            drop_oldest: Drop the oldest frame when a stage falls behind
+                (live sources); False applies back-pressure instead
+        """
+        self.on_stop = on_stop
+        self.stages = []
+        input_queue = None
+        for index, (name, func) in enumerate(steps):
+            is_last = index == len(steps) - 1
+            output_queue = None if is_last else DropOldestQueue(
+                queue_size, on_drop, block=not drop_oldest
+            )
+            self.stages.append(PipelineStage(
+                name, func, input_queue, output_queue,
+                on_error=on_drop if input_queue is not None else None
+            ))
+            input_queue = output_queue
+
+    def start(self):
+        """Start every stage"""
+        for stage in self.stages[:-1]:
+            stage.start()
+        self.stages[-1].start(on_stop=self.on_stop)
+
+    def is_alive(self):
+        """Whether any stage is still running"""
+        return any(stage.is_alive() for stage in self.stages)
+
+    def get_stats(self):
+        """Get throughput counters for every stage"""
+        return {stage.name: stage.get_stats() for stage in self.stages}
@@ -1,10 +1,148 @@
 """
 Flask routes for the Baby Safety Monitoring System
 """
-from flask import Response, jsonify
-from camera import get_camera_handler
+import os
+import json
+from datetime import datetime
+from flask import Response, jsonify, abort, request, send_from_directory, url_for
+from camera import get_camera_handler, get_camera_ids, collect_metrics
+from metrics import render_metrics, CONTENT_TYPE
 from utils import get_local_ip
 from templates import HTML_TEMPLATE
+from encoding import parse_stream_options
+from models import get_model_status
+from alert_log import get_alert_log
+from clips import list_clips
+from config import (
+    ALERT_STREAM_HEARTBEAT,
+    MODEL_RETRY_AFTER,
+    ALERT_LOG_ENABLED,
+    ALERT_LOG_PAGE_LIMIT,
+    CLIP_DIR,
+    CLIP_EXTENSION
+)
+
+
+def _get_camera_or_404(camera_id):
+    """Get a camera handler, aborting with 404 for unknown camera IDs"""
+    try:
+        return get_camera_handler(camera_id)
+    except KeyError:
+        abort(404, description=f"Unknown camera '{camera_id}'")
+
+
+def _warming_up_response():
+    """
+    Get the response for requests that need the model while it is loading
+    
+    Returns:
+        Response: 503 with the model state, or None if the model is ready
+    """
+    status = get_model_status()
+    if status['ready']:
+        return None
+    response = jsonify({**status, 'message': 'Model is warming up'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(MODEL_RETRY_AFTER)
+    return response
+
+
+def _parse_time(value):
+    """
+    Parse a query time given as Unix seconds or ISO 8601 (local time if no offset)
+    
+    Raises:
+        ValueError: If the value is neither
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_last_event_id():
+    """Read the resume position from the Last-Event-ID header or query string"""
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def start_alert_stream(detection, last_event_id=None):
+    """
+    Build the opening messages of an alert stream
+    
+    Fresh clients, or clients whose position fell out of the event backlog,
+    get a snapshot of the current alerts before live events.
+    
+    Args:
+        detection: DetectionProcessor whose alert events are streamed
+        last_event_id: Last event ID the client saw, None for a fresh connection
+    
+    Returns:
+        tuple: (event ID to stream from, list of SSE messages to send first)
+    """
+    events = detection.events
+    messages = ["retry: 3000\n\n"]
+    if last_event_id is None or not events.can_resume(last_event_id):
+        last_event_id = events.last_event_id
+        snapshot = detection.get_alerts_summary()
+        messages.append(
+            f"id: {last_event_id}\nevent: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+        )
+    return last_event_id, messages
+
+
+def generate_alert_events(detection, last_event_id=None):
+    """
+    Stream alert events from a detection processor as Server-Sent Events
+    
+    Args:
+        detection: DetectionProcessor whose alert events are streamed
+        last_event_id: Last event ID the client saw, None for a fresh connection
+    
+    Yields:
+        str: SSE messages and heartbeat comments
+    """
+    last_event_id, messages = start_alert_stream(detection, last_event_id)
+    yield from messages
+    yield from generate_events(detection.events, last_event_id)
+
+
+def start_frame_stream(events, last_event_id=None):
+    """
+    Get the event ID a frame record stream starts after
+    
+    Fresh clients start with the next frame; clients resuming within the
+    backlog get the records they missed first.
+    """
+    if last_event_id is None or not events.can_resume(last_event_id):
+        return events.last_event_id
+    return last_event_id
+
+
+def generate_events(events, last_event_id):
+    """
+    Stream events published after last_event_id as Server-Sent Events
+    
+    Args:
+        events: AlertEventBus to stream from
+        last_event_id: Last event ID the client saw
+    
+    Yields:
+        str: SSE messages and heartbeat comments
+    """
+    while True:
+        new_events = events.wait_for_events(last_event_id, ALERT_STREAM_HEARTBEAT)
+        if not new_events:
+            yield ": heartbeat\n\n"
+            continue
+        for event_id, message in new_events:
+            last_event_id = event_id
+            yield message
 
 
 def register_routes(app):
@@ -15,12 +153,39 @@ def register_routes(app):
         """Serve the main HTML page"""
         return HTML_TEMPLATE
     
+    @app.route('/cameras')
+    def cameras():
+        """List the configured camera IDs"""
+        return jsonify({'cameras': get_camera_ids()})
+    
+    @app.route('/ready')
+    def ready():
+        """Readiness check: 200 once the model is loaded and warmed up, else 503"""
+        status = get_model_status()
+        return jsonify(status), 200 if status['ready'] else 503
+    
     @app.route('/video_feed')
-    def video_feed():
-        """Stream video feed with object detection"""
-        camera = get_camera_handler()
+    @app.route('/video_feed/<camera_id>')
+    def video_feed(camera_id=None):
+        """
+        Stream video feed with object detection
+        
+        Optional query parameters: quality (JPEG quality), scale (resize
+        factor, e.g. 0.5), max_fps (frame rate cap for this client) and
+        raw=1 (camera image without detection overlay).
+        """
+        camera = _get_camera_or_404(camera_id)
+        warming_up = _warming_up_response()
+        if warming_up is not None:
+            return warming_up
+        variant, max_fps = parse_stream_options(
+            request.args.get('quality'),
+            request.args.get('scale'),
+            request.args.get('max_fps'),
+            request.args.get('raw')
+        )
         return Response(
-            camera.generate_frames(),
+            camera.generate_frames(variant, max_fps),
             mimetype='multipart/x-mixed-replace; boundary=frame'
         )
     
@@ -33,8 +198,110 @@ def register_routes(app):
         })
     
     @app.route('/get_alerts')
-    def get_alerts():
+    @app.route('/get_alerts/<camera_id>')
+    def get_alerts(camera_id=None):
         """Get current alerts from the detection system"""
-        camera = get_camera_handler()
+        camera = _get_camera_or_404(camera_id)
+        warming_up = _warming_up_response()
+        if warming_up is not None:
+            return warming_up
         summary = camera.detection.get_alerts_summary()
         return jsonify(summary)
+
+    @app.route('/alerts/stream')
+    @app.route('/alerts/stream/<camera_id>')
+    def alerts_stream(camera_id=None):
+        """Push alert episode changes to the client as Server-Sent Events"""
+        camera = _get_camera_or_404(camera_id)
+        return Response(
+            generate_alert_events(camera.detection, _parse_last_event_id()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    @app.route('/frames/stream')
+    @app.route('/frames/stream/<camera_id>')
+    def frames_stream(camera_id=None):
+        """
+        Push one metadata record per published frame as Server-Sent Events
+        
+        Each 'frame' event carries the frame's sequence number, capture
+        timestamp, latencies, detections and critical alert IDs; alerts
+        carry the matching frame_seq and last_frame_seq.
+        """
+        camera = _get_camera_or_404(camera_id)
+        warming_up = _warming_up_response()
+        if warming_up is not None:
+            return warming_up
+        camera.start()
+        last_event_id = start_frame_stream(camera.frame_events, _parse_last_event_id())
+        return Response(
+            generate_events(camera.frame_events, last_event_id),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    @app.route('/alerts/history')
+    @app.route('/alerts/history/<camera_id>')
+    def alerts_history(camera_id=None):
+        """
+        Page through logged alert episodes, newest first
+        
+        Optional query parameters: from and to (Unix seconds or ISO 8601,
+        matched against the episode start), hazard (class name), limit, and
+        cursor (the 'next' value of the previous page). Without a camera ID
+        episodes from every camera are listed.
+        """
+        if not ALERT_LOG_ENABLED:
+            abort(404, description='Alert log is disabled')
+        if camera_id is not None and camera_id not in get_camera_ids():
+            abort(404, description=f"Unknown camera '{camera_id}'")
+        try:
+            page = get_alert_log().query(
+                start=_parse_time(request.args.get('from')),
+                end=_parse_time(request.args.get('to')),
+                hazard=request.args.get('hazard'),
+                camera_id=camera_id,
+                limit=request.args.get('limit', ALERT_LOG_PAGE_LIMIT),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({'error': f"Invalid query parameter: {e}"}), 400
+        return jsonify(page)
+    
+    @app.route('/clips')
+    @app.route('/clips/<camera_id>')
+    def clips(camera_id=None):
+        """List saved event clips, newest first, from every camera or one"""
+        if camera_id is not None and camera_id not in get_camera_ids():
+            abort(404, description=f"Unknown camera '{camera_id}'")
+        clips = list_clips(CLIP_DIR, camera_id)
+        for clip in clips:
+            clip['url'] = url_for('clip_file', filename=clip['name'])
+        return jsonify({'clips': clips})
+    
+    @app.route('/clip/<filename>')
+    def clip_file(filename):
+        """Serve a clip; Range requests let players seek without downloading it all"""
+        # Only finished clips: not sidecars or the hidden file still being written
+        if filename.startswith('.') or not filename.endswith(CLIP_EXTENSION):
+            abort(404)
+        return send_from_directory(os.path.abspath(CLIP_DIR), filename, conditional=True)
+    
+    @app.route('/status')
+    @app.route('/status/<camera_id>')
+    def status(camera_id=None):
+        """Get frame rates and per-stage pipeline throughput"""
+        camera = _get_camera_or_404(camera_id)
+        return jsonify({
+            'viewers': camera.broadcaster.viewer_count,
+            'fps': camera.get_fps_stats(),
+            'pipeline': camera.get_pipeline_stats(),
+            'motion': camera.motion_gate.get_stats() if camera.motion_gate else None,
+            'buffers': camera.buffer_pool.get_stats() if camera.buffer_pool else None
+        })
+    
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics: per-step timings, drops, queues, viewers and alerts"""
+        return Response(render_metrics(collect_metrics()), content_type=CONTENT_TYPE)
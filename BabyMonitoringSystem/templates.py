@@ -151,12 +151,12 @@ HTML_TEMPLATE = '''
             </div>
             <div class="status-item">
                 <div class="status-label">AI Model</div>
-                <div class="status-value" id="modelStatus">Ready 🤖</div>
+                <div class="status-value" id="modelStatus">Loading ⏳</div>
             </div>
         </div>
         
         <div class="video-container">
-            <img src="/video_feed" id="videoFeed" alt="Live Camera Feed">
+            <img src="/video_feed" id="videoFeed" alt="Live Camera Feed" onerror="retryVideoFeed()">
         </div>
         
         <div class="alerts-container">
@@ -182,13 +182,16 @@ HTML_TEMPLATE = '''
     <script>
         // System variables
         let autoAlertsEnabled = true;
-        let lastAlertCheck = 0;
         let isPlayingSound = false;
+        let alertStream = null;
         let alertCheckInterval;
+        let alarmInterval = null;
+        let currentAlerts = [];
         
         // Initialize
         document.addEventListener('DOMContentLoaded', function() {
             getLocalIP();
+            checkModelReady();
             requestNotificationPermission();
             startAutoAlertCheck();
         });
@@ -213,17 +216,83 @@ HTML_TEMPLATE = '''
             }
         }
         
-        // Start automatic alert checking
+        // Start automatic alerts: server push, or polling on old browsers
         function startAutoAlertCheck() {
-            checkForAlerts();
-            alertCheckInterval = setInterval(checkForAlerts, 2000);
+            if (!window.EventSource) {
+                checkForAlerts();
+                alertCheckInterval = setInterval(checkForAlerts, 2000);
+                return;
+            }
+            
+            // The browser reconnects on its own and resumes from the last event ID
+            alertStream = new EventSource('/alerts/stream');
+            
+            alertStream.addEventListener('snapshot', event => {
+                const data = JSON.parse(event.data);
+                currentAlerts = data.alerts || [];
+                showAlerts();
+                updateAlarm(data.critical_now);
+            });
+            
+            // Sent whenever the number of ongoing critical episodes changes
+            alertStream.addEventListener('state', event => {
+                updateAlarm(JSON.parse(event.data).critical_now);
+            });
+            
+            alertStream.addEventListener('episode_open', event => {
+                const alert = JSON.parse(event.data);
+                upsertAlert(alert);
+                triggerAutomaticAlert(alert);
+            });
+            
+            alertStream.addEventListener('episode_close', event => {
+                upsertAlert(JSON.parse(event.data));
+            });
         }
         
-        // Stop automatic alert checking
+        // Stop automatic alerts
         function stopAutoAlertCheck() {
+            if (alertStream) {
+                alertStream.close();
+                alertStream = null;
+            }
             if (alertCheckInterval) {
                 clearInterval(alertCheckInterval);
             }
+            updateAlarm(0);
+        }
+        
+        // Sound alerts every 2 seconds while a critical episode is ongoing
+        function updateAlarm(criticalNow) {
+            if (criticalNow > 0 && !alarmInterval) {
+                playAlertSound();
+                vibratePhone();
+                alarmInterval = setInterval(() => {
+                    playAlertSound();
+                    vibratePhone();
+                }, 2000);
+            } else if (!criticalNow && alarmInterval) {
+                clearInterval(alarmInterval);
+                alarmInterval = null;
+            }
+        }
+        
+        // Add or replace an alert episode in the local list
+        function upsertAlert(alert) {
+            const index = currentAlerts.findIndex(a => a.id === alert.id);
+            if (index >= 0) {
+                currentAlerts[index] = alert;
+            } else {
+                currentAlerts.push(alert);
+                currentAlerts = currentAlerts.slice(-10);
+            }
+            showAlerts();
+        }
+        
+        // Show the alert count and list
+        function showAlerts() {
+            document.getElementById('alertCount').textContent = currentAlerts.length;
+            updateAlertsList(currentAlerts);
         }
         
         // Toggle auto-alerts
@@ -242,7 +311,7 @@ HTML_TEMPLATE = '''
             }
         }
         
-        // Main function: Check for alerts
+        // Fallback: poll for alerts
         async function checkForAlerts() {
             if (!autoAlertsEnabled) return;
             
@@ -250,16 +319,14 @@ HTML_TEMPLATE = '''
                 const response = await fetch('/get_alerts');
                 const data = await response.json();
                 
-                // Update alert count
-                document.getElementById('alertCount').textContent = data.total;
-                
-                // Update alerts list
-                updateAlertsList(data.alerts);
+                currentAlerts = data.alerts || [];
+                showAlerts();
                 
-                // Check if we have new critical alerts
-                if (data.alerts && data.alerts.length > 0) {
-                    const latestAlert = data.alerts[0];
-                    const alertTime = latestAlert.timestamp * 1000;
+                // Check if we have ongoing critical alert episodes
+                if (currentAlerts.length > 0) {
+                    const latestAlert = currentAlerts.reduce((a, b) => 
+                        (b.last_seen || b.timestamp) > (a.last_seen || a.timestamp) ? b : a);
+                    const alertTime = (latestAlert.last_seen || latestAlert.timestamp) * 1000;
                     
                     if (Date.now() - alertTime < 10000) {
                         triggerAutomaticAlert(latestAlert);
@@ -281,15 +348,16 @@ HTML_TEMPLATE = '''
             
             alertsList.innerHTML = '';
             
-            // Show latest 5 alerts
-            alerts.slice(0, 5).forEach(alert => {
+            // Show latest 5 alert episodes
+            alerts.slice(-5).reverse().forEach(alert => {
                 const alertDiv = document.createElement('div');
                 alertDiv.className = 'alert-item';
                 const time = new Date(alert.timestamp * 1000).toLocaleTimeString();
+                const duration = alert.last_seen ? Math.round(alert.last_seen - alert.start_time) : 0;
                 alertDiv.innerHTML = `
-                    <strong>${alert.type}</strong> - ${time}<br>
+                    <strong>${alert.type}</strong> - ${time} (${duration}s, ${alert.frame_count || 1} frames)<br>
                     ${alert.message}<br>
-                    <small>Distance: ${alert.distance?.toFixed(1) || 'N/A'}px</small>
+                    <small>Closest: ${(alert.min_distance ?? alert.distance)?.toFixed(1) || 'N/A'}px</small>
                 `;
                 alertsList.appendChild(alertDiv);
             });
@@ -380,6 +448,36 @@ HTML_TEMPLATE = '''
             }, 600);
         }
         
+        // Show whether the model is loaded, warming up or failed
+        async function checkModelReady() {
+            try {
+                const response = await fetch('/ready');
+                const data = await response.json();
+                const status = document.getElementById('modelStatus');
+                if (data.ready) {
+                    status.textContent = 'Ready 🤖';
+                } else if (data.state === 'error') {
+                    status.textContent = 'Error ❌';
+                } else {
+                    status.textContent = 'Warming up ⏳';
+                }
+                return data.ready;
+            } catch (error) {
+                console.error('Error checking model status:', error);
+                return false;
+            }
+        }
+        
+        // The feed answers 503 while the model warms up; try again shortly
+        async function retryVideoFeed() {
+            await checkModelReady();
+            setTimeout(() => {
+                const video = document.getElementById('videoFeed');
+                video.src = '/video_feed?t=' + new Date().getTime();
+                checkModelReady();
+            }, 2000);
+        }
+        
         // Auto-refresh video every 30 seconds
         setInterval(() => {
             const video = document.getElementById('videoFeed');
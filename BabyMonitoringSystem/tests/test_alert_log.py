@@ -0,0 +1,68 @@
+import pytest
+from alert_log import AlertLog
+
+
+def episode(episode_id, start_time, hazard='knife'):
+    return {
+        'id': episode_id, 'type': 'CRITICAL', 'hazard': hazard, 'track_id': episode_id,
+        'start_time': start_time, 'last_seen': start_time + 1, 'min_distance': 42.0,
+        'frame_count': 3, 'message': f'CRITICAL: Baby near {hazard}'
+    }
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = AlertLog(str(tmp_path / 'alerts.db'))
+    # Several episodes share a start time, as when two hazards appear in one frame
+    for i, start_time in enumerate([100.0] * 5 + [101.0] * 4 + [102.0, 103.0], start=1):
+        log.record('nursery', episode(i, start_time, 'knife' if i % 2 else 'scissors'))
+    log.close()  # flush the writer
+    return log
+
+
+def walk(log, **filters):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page = log.query(limit=3, cursor=cursor, **filters)
+        rows += page['alerts']
+        pages += 1
+        cursor = page['next']
+        if cursor is None:
+            return rows, pages
+
+
+def test_pages_return_every_row_once_newest_first(log):
+    rows, pages = walk(log)
+    assert len(rows) == 11
+    assert len({row['id'] for row in rows}) == 11
+    assert pages == 4
+    keys = [(row['start_time'], row['id']) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_pages_with_filters(log):
+    rows, _ = walk(log, hazard='knife', start=100.5)
+    assert sorted(row['episode_id'] for row in rows) == [7, 9, 11]
+    rows, _ = walk(log, hazard='scissors', end=101.0)
+    assert sorted(row['episode_id'] for row in rows) == [2, 4]
+
+
+def test_exact_page_has_no_next_cursor(log):
+    page = log.query(limit=11)
+    assert len(page['alerts']) == 11
+    assert page['next'] is None
+
+
+def test_closed_episode_updates_its_row(tmp_path):
+    log = AlertLog(str(tmp_path / 'alerts.db'))
+    log.record('nursery', episode(1, 100.0))
+    log.record('nursery', dict(episode(1, 100.0), last_seen=108.0, frame_count=40), closed=True)
+    log.close()
+    [row] = log.query()['alerts']
+    assert row['end_time'] == 108.0
+    assert row['frame_count'] == 40
+
+
+def test_malformed_cursor(log):
+    with pytest.raises(ValueError):
+        log.query(cursor='not-a-cursor')
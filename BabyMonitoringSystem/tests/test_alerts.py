@@ -0,0 +1,73 @@
+from alerts import AlertHistory, AlertEventBus
+
+
+def make_history(timestamps, capacity=10, max_age=60):
+    history = AlertHistory(capacity, max_age)
+    for timestamp in timestamps:
+        history.append({'id': timestamp, 'timestamp': timestamp})
+    return history
+
+
+def ids(alerts):
+    return [alert['id'] for alert in alerts]
+
+
+def test_recent_window_excludes_its_start():
+    history = make_history([100, 110, 120, 130])
+    alerts, count = history.get_recent(20, limit=10, now=130)
+    assert ids(alerts) == [120, 130]
+    assert count == 2
+
+
+def test_recent_limit_keeps_newest():
+    history = make_history([100, 110, 120, 130])
+    alerts, count = history.get_recent(60, limit=2, now=130)
+    assert ids(alerts) == [120, 130]
+    assert count == 4
+
+
+def test_old_alerts_evicted_on_append():
+    history = make_history([100, 110, 170], max_age=60)
+    assert len(history) == 2
+    alerts, _ = history.get_recent(1000, limit=10, now=170)
+    assert ids(alerts) == [110, 170]
+
+
+def test_capacity_overwrites_oldest_across_wraparound():
+    history = make_history(range(100, 107), capacity=4)
+    assert len(history) == 4
+    alerts, count = history.get_recent(1000, limit=10, now=106)
+    assert ids(alerts) == [103, 104, 105, 106]
+    alerts, count = history.get_recent(2.5, limit=10, now=106)
+    assert ids(alerts) == [104, 105, 106]
+    assert count == 3
+
+
+def publish(bus, count):
+    for i in range(count):
+        bus.publish('episode_open', {'n': i})
+
+
+def test_resume_returns_only_missed_events():
+    bus = AlertEventBus(backlog=10)
+    publish(bus, 5)
+    assert bus.can_resume(3)
+    events = bus.wait_for_events(3, timeout=0)
+    assert [event_id for event_id, _ in events] == [4, 5]
+    assert events[0][1].startswith('id: 4\nevent: episode_open\ndata: {"n": 3}')
+
+
+def test_resume_up_to_date_waits_for_new_events():
+    bus = AlertEventBus(backlog=10)
+    publish(bus, 2)
+    assert bus.can_resume(2)
+    assert bus.wait_for_events(2, timeout=0.01) == []
+
+
+def test_cannot_resume_outside_backlog():
+    bus = AlertEventBus(backlog=3)
+    publish(bus, 6)
+    assert bus.can_resume(3)  # events 4-6 are all still kept
+    assert not bus.can_resume(2)
+    # An ID from before a server restart is ahead of this bus
+    assert not bus.can_resume(7)
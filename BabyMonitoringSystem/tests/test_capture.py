@@ -0,0 +1,24 @@
+import cv2
+import pytest
+from capture import is_live_source, open_capture
+
+
+def test_live_sources():
+    assert is_live_source(0)
+    assert is_live_source('1')
+    assert is_live_source('rtsp://192.168.1.10:554/stream')
+    assert is_live_source('http://camera.local/video.mjpg')
+    assert not is_live_source('recordings/night.mp4')
+
+
+def test_stream_urls_are_opened_directly(monkeypatch):
+    opened = []
+    monkeypatch.setattr(cv2, 'VideoCapture', opened.append)
+    open_capture('rtsp://192.168.1.10:554/stream')
+    open_capture('2')
+    assert opened == ['rtsp://192.168.1.10:554/stream', 2]
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_capture(str(tmp_path / 'missing.mp4'))
@@ -0,0 +1,77 @@
+import json
+import pytest
+
+pytest.importorskip('ultralytics')
+
+import detection
+from config import ALERT_COOLDOWN, CRITICAL_DISTANCE
+from routes import start_alert_stream
+
+BABY = [100, 100, 180, 180]
+NEAR_KNIFE = {'bbox': [150, 120, 210, 180], 'name': 'knife', 'confidence': 0.9, 'track_id': 1}
+FAR_KNIFE = {'bbox': [500, 300, 560, 360], 'name': 'knife', 'confidence': 0.9, 'track_id': 1}
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setattr(detection, 'ALERT_LOG_ENABLED', False)
+    return detection.DetectionProcessor('test')
+
+
+def events_of(processor, after=0):
+    return [
+        message.split('\n')[1][len('event: '):]
+        for _, message in processor.events.wait_for_events(after, timeout=0)
+    ]
+
+
+def test_sightings_within_cooldown_share_an_episode(processor):
+    for t in (0, 1, 2, 2 + ALERT_COOLDOWN):
+        _, critical = processor.process_distances([BABY], [NEAR_KNIFE], t, frame_seq=t)
+        assert critical
+    assert processor.next_episode_id == 2
+    episode = processor.active_episodes[('knife', 'track', 1)]
+    assert episode['frame_count'] == 4
+    assert episode['frame_seq'] == 0
+    assert episode['last_frame_seq'] == 2 + ALERT_COOLDOWN
+    assert events_of(processor) == ['episode_open', 'state']
+
+
+def test_episode_closes_after_cooldown_and_a_new_one_opens(processor):
+    processor.process_distances([BABY], [NEAR_KNIFE], 0)
+    processor.process_distances([BABY], [FAR_KNIFE], ALERT_COOLDOWN)
+    assert processor.active_episodes  # not yet past the cooldown
+    processor.process_distances([BABY], [FAR_KNIFE], ALERT_COOLDOWN + 0.5)
+    assert not processor.active_episodes
+    processor.process_distances([BABY], [NEAR_KNIFE], ALERT_COOLDOWN + 1)
+    assert processor.next_episode_id == 3
+    # critical_now drops to 0 as soon as the knife moves away; the episode
+    # itself only closes once the cooldown has passed
+    assert events_of(processor) == [
+        'episode_open', 'state', 'state', 'episode_close', 'episode_open', 'state'
+    ]
+
+
+def test_far_hazard_is_not_critical(processor):
+    distance_data, critical = processor.process_distances([BABY], [FAR_KNIFE], 0)
+    assert not critical
+    assert distance_data['distances'][0, 0] >= CRITICAL_DISTANCE
+    assert processor.next_episode_id == 1
+
+
+def test_alert_stream_resume(processor):
+    processor.process_distances([BABY], [NEAR_KNIFE], 0)
+    last_event_id = processor.events.last_event_id
+
+    # A resuming client gets no snapshot and continues after its last event
+    resumed_from, messages = start_alert_stream(processor, last_event_id - 1)
+    assert resumed_from == last_event_id - 1
+    assert messages == ['retry: 3000\n\n']
+
+    # A new client, or one from before a restart, starts with a snapshot
+    for client_id in (None, last_event_id + 5):
+        resumed_from, messages = start_alert_stream(processor, client_id)
+        assert resumed_from == last_event_id
+        assert messages[1].startswith(f"id: {last_event_id}\nevent: snapshot\n")
+        snapshot = json.loads(messages[1].split('data: ', 1)[1])
+        assert snapshot['critical_now'] == 1
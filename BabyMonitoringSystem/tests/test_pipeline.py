@@ -0,0 +1,31 @@
+import threading
+from pipeline import FramePipeline
+
+
+def make_source(count):
+    items = iter(range(count))
+    return lambda: next(items, None)
+
+
+def test_failing_frame_does_not_stop_stage():
+    results = []
+    released = []
+    done = threading.Event()
+
+    def flaky(item):
+        if item == 2:
+            raise RuntimeError('bad frame')
+        return item
+
+    pipeline = FramePipeline(
+        [('source', make_source(5)), ('flaky', flaky), ('sink', results.append)],
+        queue_size=10, on_stop=done.set, on_drop=released.append, drop_oldest=False
+    )
+    pipeline.start()
+    assert done.wait(5)
+
+    assert results == [0, 1, 3, 4]
+    assert released == [2]
+    stats = pipeline.get_stats()
+    assert stats['flaky']['errors'] == 1
+    assert stats['flaky']['processed'] == 4
@@ -0,0 +1,39 @@
+import numpy as np
+from tracking import ObjectTracker
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def run(speed, width=50, keyframe_interval=3, frames=30):
+    """Move one knife at a constant speed; return its track IDs and the tracker"""
+    tracker = ObjectTracker('velocity', keyframe_interval)
+    track_ids = []
+    for i in range(frames):
+        x = 20 + speed * i
+        if tracker.keyframe_due():
+            hazard = {'bbox': [x, 100, x + width, 100 + width], 'name': 'knife', 'confidence': 0.9}
+            _, hazards = tracker.update_detections(FRAME, [], [hazard])
+        else:
+            _, hazards = tracker.track(FRAME)
+        track_ids.append(hazards[0]['track_id'])
+    return track_ids, tracker
+
+
+def test_constant_speed_keeps_track_and_velocity():
+    track_ids, tracker = run(speed=3)
+    assert set(track_ids) == {1}
+    assert abs(tracker.tracks[0].velocity[0] - 3) < 0.01
+
+
+def test_fast_object_keeps_track_after_first_interval():
+    # A prediction lagging behind the object drops below the IoU threshold
+    # at this speed and the knife would get a new ID on a later keyframe
+    track_ids, tracker = run(speed=10, width=100)
+    assert set(track_ids) == {1}
+    assert abs(tracker.tracks[0].velocity[0] - 10) < 0.01
+
+
+def test_predicted_box_follows_object():
+    _, tracker = run(speed=3, frames=29)
+    _, hazards = tracker.track(FRAME)
+    assert abs(hazards[0]['bbox'][0] - (20 + 3 * 29)) < 0.01
@@ -0,0 +1,186 @@
+"""
+Lightweight object tracking between keyframe detections
+"""
+import cv2
+from config import (
+    TRACKER_TYPE,
+    TRACKING_KEYFRAME_INTERVAL,
+    TRACKING_IOU_THRESHOLD
+)
+
+
+def box_iou(box1, box2):
+    """
+    Calculate intersection over union of two bounding boxes
+
+    Args:
+        box1: First bounding box [x1, y1, x2, y2]
+        box2: Second bounding box [x1, y1, x2, y2]
+
+    Returns:
+        float: IoU between 0 and 1
+    """
+    inter_w = min(box1[2], box2[2]) - max(box1[0], box2[0])
+    inter_h = min(box1[3], box2[3]) - max(box1[1], box2[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    intersection = inter_w * inter_h
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    return intersection / (area1 + area2 - intersection)
+
+
+def create_opencv_tracker(tracker_type):
+    """
+    Create an OpenCV single-object tracker by name
+
+    Args:
+        tracker_type: 'mil', 'kcf' or 'csrt'
+
+    Returns:
+        OpenCV tracker instance
+    """
+    name = f"Tracker{tracker_type.upper()}_create"
+    factory = getattr(cv2, name, None)
+    if factory is None and hasattr(cv2, 'legacy'):
+        factory = getattr(cv2.legacy, name, None)
+    if factory is None:
+        raise ValueError(
+            f"OpenCV tracker '{tracker_type}' is not available "
+            f"(KCF and CSRT need opencv-contrib-python)"
+        )
+    return factory()
+
+
+class Track:
+    """A single tracked object"""
+
+    def __init__(self, track_id, name, bbox, confidence, step):
+        """Initialize the track from a detection"""
+        self.track_id = track_id
+        self.name = name
+        self.bbox = list(bbox)  # current box, propagated between keyframes
+        self.confidence = confidence
+        self.velocity = [0.0, 0.0, 0.0, 0.0]
+        self.detected_bbox = list(bbox)  # last detected box and its frame step
+        self.detected_step = step
+        self.tracker = None
+
+
+class ObjectTracker:
+    """
+    Propagates detections between keyframes and assigns stable track IDs
+
+    On keyframes, detections are matched to existing tracks by IoU so objects
+    keep their ID. Between keyframes boxes are moved either with a constant
+    velocity model ('velocity') or an OpenCV tracker ('mil', 'kcf', 'csrt').
+    """
+
+    def __init__(self, tracker_type=TRACKER_TYPE,
+                 keyframe_interval=TRACKING_KEYFRAME_INTERVAL):
+        """Initialize the tracker"""
+        self.tracker_type = tracker_type
+        self.keyframe_interval = keyframe_interval
+        self.tracks = []
+        self.next_track_id = 1
+        self.frames_since_keyframe = 0
+        self.step = 0  # frames seen by the tracker, detected or propagated
+
+    def keyframe_due(self):
+        """Whether the next frame should get a full detection"""
+        return not self.tracks or self.frames_since_keyframe >= self.keyframe_interval - 1
+
+    def update_detections(self, frame, baby_boxes, hazard_boxes):
+        """
+        Match keyframe detections to existing tracks
+
+        Args:
+            frame: Frame the detections came from
+            baby_boxes: List of baby bounding boxes
+            hazard_boxes: List of hazard detections
+
+        Returns:
+            tuple: (baby_boxes, hazard_boxes) with a 'track_id' on each hazard
+        """
+        detections = [('baby', bbox, 1.0) for bbox in baby_boxes]
+        detections += [(h['name'], h['bbox'], h['confidence']) for h in hazard_boxes]
+
+        self.step += 1
+        unmatched = list(self.tracks)
+        tracks = []
+
+        for name, bbox, confidence in detections:
+            # Match against the propagated box, i.e. where the track was predicted
+            best, best_iou = None, TRACKING_IOU_THRESHOLD
+            for track in unmatched:
+                if track.name != name:
+                    continue
+                iou = box_iou(track.bbox, bbox)
+                if iou >= best_iou:
+                    best, best_iou = track, iou
+
+            if best is not None:
+                unmatched.remove(best)
+                # Measured between detections: the propagated box already
+                # carries the old velocity and would bias the estimate down
+                elapsed = self.step - best.detected_step
+                best.velocity = [(new - old) / elapsed for new, old in zip(bbox, best.detected_bbox)]
+                best.bbox = list(bbox)
+                best.detected_bbox = list(bbox)
+                best.detected_step = self.step
+                best.confidence = confidence
+                track = best
+            else:
+                track = Track(self.next_track_id, name, bbox, confidence, self.step)
+                self.next_track_id += 1
+
+            if self.tracker_type != 'velocity':
+                track.tracker = create_opencv_tracker(self.tracker_type)
+                x1, y1, x2, y2 = map(int, bbox)
+                track.tracker.init(frame, (x1, y1, max(1, x2 - x1), max(1, y2 - y1)))
+            tracks.append(track)
+
+        self.tracks = tracks
+        self.frames_since_keyframe = 0
+        return self._current_boxes()
+
+    def track(self, frame):
+        """
+        Propagate all tracks to a new frame without running detection
+
+        Args:
+            frame: Current frame
+
+        Returns:
+            tuple: (baby_boxes, hazard_boxes) with a 'track_id' on each hazard
+        """
+        self.frames_since_keyframe += 1
+        self.step += 1
+        kept = []
+        for track in self.tracks:
+            if track.tracker is None:
+                track.bbox = [c + v for c, v in zip(track.bbox, track.velocity)]
+            else:
+                ok, (x, y, w, h) = track.tracker.update(frame)
+                if not ok:
+                    continue
+                track.bbox = [float(x), float(y), float(x + w), float(y + h)]
+            kept.append(track)
+        self.tracks = kept
+        return self._current_boxes()
+
+    def _current_boxes(self):
+        """Split current tracks into baby boxes and hazard detections"""
+        baby_boxes = []
+        hazard_boxes = []
+        for track in self.tracks:
+            if track.name == 'baby':
+                baby_boxes.append(list(track.bbox))
+            else:
+                hazard_boxes.append({
+                    'bbox': list(track.bbox),
+                    'name': track.name,
+                    'confidence': track.confidence,
+                    'track_id': track.track_id
+                })
+        return baby_boxes, hazard_boxes
@@ -3,6 +3,7 @@ Utility functions for distance calculations and helpers
 """
 import math
 from datetime import datetime
+import numpy as np
 
 
 def calculate_distance(box1, box2):
@@ -25,6 +26,68 @@ def calculate_distance(box1, box2):
     return distance, (int(x1_center), int(y1_center)), (int(x2_center), int(y2_center))
 
 
+def calculate_distance_matrix(baby_boxes, hazard_boxes):
+    """
+    Calculate center distances between every baby and every hazard box at once
+    
+    Args:
+        baby_boxes: Array-like of baby boxes, shape (B, 4) as [x1, y1, x2, y2]
+        hazard_boxes: Array-like of hazard boxes, shape (H, 4)
+    
+    Returns:
+        tuple: (distances (B, H), baby_centers (B, 2), hazard_centers (H, 2))
+    """
+    baby = np.asarray(baby_boxes, dtype=np.float32).reshape(-1, 4)
+    hazard = np.asarray(hazard_boxes, dtype=np.float32).reshape(-1, 4)
+    
+    baby_centers = (baby[:, :2] + baby[:, 2:]) / 2
+    hazard_centers = (hazard[:, :2] + hazard[:, 2:]) / 2
+    
+    deltas = hazard_centers[np.newaxis, :, :] - baby_centers[:, np.newaxis, :]
+    distances = np.sqrt(np.einsum('ijk,ijk->ij', deltas, deltas))
+    return distances, baby_centers, hazard_centers
+
+
+def clip_roi(roi, width, height):
+    """
+    Clip a region of interest to the frame
+    
+    Args:
+        roi: (x1, y1, x2, y2) in frame pixels, or None for the whole frame
+        width: Frame width
+        height: Frame height
+    
+    Returns:
+        tuple: Integer (x1, y1, x2, y2) inside the frame
+    """
+    if roi is None:
+        return 0, 0, width, height
+    x1, y1, x2, y2 = (int(value) for value in roi)
+    x1, x2 = max(0, min(x1, width - 1)), max(1, min(x2, width))
+    y1, y2 = max(0, min(y1, height - 1)), max(1, min(y2, height))
+    if x2 <= x1 or y2 <= y1:
+        raise ValueError(f"Empty region of interest {roi} for a {width}x{height} frame")
+    return x1, y1, x2, y2
+
+
+def crop_roi(frame, roi):
+    """
+    Get the part of a frame inside a region of interest, without copying
+    
+    Args:
+        frame: Image array
+        roi: (x1, y1, x2, y2) in frame pixels, or None for the whole frame
+    
+    Returns:
+        tuple: (cropped view, (x, y) offset of the crop in the frame)
+    """
+    if roi is None:
+        return frame, (0, 0)
+    height, width = frame.shape[:2]
+    x1, y1, x2, y2 = clip_roi(roi, width, height)
+    return frame[y1:y2, x1:x2], (x1, y1)
+
+
 def get_local_ip():
     """Get the server's local IP address"""
     import socket